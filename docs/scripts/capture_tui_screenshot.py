@@ -17,18 +17,57 @@ This script uses Textual's Pilot API to programmatically control and screenshot
 
 import argparse
 import asyncio
+import contextlib
 import socket
-import subprocess
+import threading
 import time
 
+import requests
 
-def find_available_port():
-    """Find an available port by binding to port 0."""
-    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-        s.bind(("", 0))
-        s.listen(1)
-        port = s.getsockname()[1]
-    return port
+
+@contextlib.contextmanager
+def reserve_port():
+    """Reserve an available port by binding to port 0 and holding the socket.
+
+    Yields ``(port, sock)``. The socket stays bound (with SO_REUSEADDR so a
+    server can rebind it straight away) until the caller closes it or hands it
+    to a server, so no other process can grab the port in the meantime.
+    """
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    try:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.bind(("127.0.0.1", 0))
+        yield sock.getsockname()[1], sock
+    finally:
+        sock.close()
+
+
+def _wait_until_ready(url, timeout=15.0, process=None):
+    """Poll ``url`` until it answers with HTTP 200, backing off exponentially.
+
+    Args:
+        url: Endpoint to poll (e.g. the ``/status`` route of the server)
+        timeout: Maximum number of seconds to wait before giving up
+        process: Optional ``Popen`` of the server; polling stops early if it exits
+
+    Raises:
+        RuntimeError: If the server exits or does not become ready in time
+    """
+    deadline = time.monotonic() + timeout
+    attempt = 0
+    while True:
+        if process is not None and process.poll() is not None:
+            raise RuntimeError("Server exited before becoming ready")
+        try:
+            if requests.get(url, timeout=1.0).status_code == 200:
+                return
+        except requests.RequestException:
+            pass
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise RuntimeError(f"Server at {url} not ready after {timeout:.1f}s")
+        time.sleep(min(0.05 * 2**attempt, 1.0, remaining))
+        attempt += 1
 
 
 async def capture_screenshot_with_pilot(status_url, output_path, wait_time=3.0):
@@ -78,48 +117,54 @@ async def capture_screenshot_with_pilot(status_url, output_path, wait_time=3.0):
 def capture_tui_screenshot(flow_file, output_path, wait_time=5.0):
     """Start flow with status server, capture TUI screenshot, cleanup.
 
+    The flow and its status server run in this process: the server is handed
+    the already-bound socket from reserve_port(), so the port is never released
+    and no second interpreter has to boot.
+
     Args:
         flow_file: Path to flow YAML file
         output_path: Path to save screenshot SVG
         wait_time: Seconds to wait for flow to make progress before capturing
     """
-    port = find_available_port()
-    print(f"Starting flow with status server on port {port}...")
-
-    # Start flow with status server
-    flow_process = subprocess.Popen(
-        ["python", "-m", "flowtoy", "run", flow_file, "--status-port", str(port)],
-        stdout=subprocess.PIPE,
-        stderr=subprocess.STDOUT,
-        text=True,
-    )
+    import uvicorn
 
-    # Give server time to start
-    time.sleep(2)
+    from flowtoy.config import load_yaml_files
+    from flowtoy.runner import LocalRunner
+    from flowtoy.runner_api import create_app_for_runner
 
-    if flow_process.poll() is not None:
-        output, _ = flow_process.communicate()
-        print(f"Flow failed to start:\n{output}")
-        raise RuntimeError("Flow failed to start")
+    with reserve_port() as (port, sock):
+        print(f"Starting flow with status server on port {port}...")
 
-    try:
-        # Capture screenshot using Pilot
-        status_url = f"http://127.0.0.1:{port}/status"
-        print(f"Capturing TUI screenshot from {status_url}...")
+        runner = LocalRunner(load_yaml_files([flow_file]))
+        server = uvicorn.Server(
+            uvicorn.Config(create_app_for_runner(runner), log_level="error")
+        )
 
-        # Run the async screenshot capture
-        asyncio.run(capture_screenshot_with_pilot(status_url, output_path, wait_time))
+        # Serve the status API on the reserved socket and run the flow
+        server_thread = threading.Thread(
+            target=server.run, kwargs={"sockets": [sock]}, daemon=True
+        )
+        server_thread.start()
+        threading.Thread(target=runner.run, daemon=True).start()
 
-    finally:
-        # Stop flow
-        print("Stopping flow...")
-        flow_process.terminate()
         try:
-            flow_process.wait(timeout=5)
-        except subprocess.TimeoutExpired:
-            flow_process.kill()
-            flow_process.wait()
-        print("Flow stopped")
+            status_url = f"http://127.0.0.1:{port}/status"
+            _wait_until_ready(status_url)
+
+            # Capture screenshot using Pilot
+            print(f"Capturing TUI screenshot from {status_url}...")
+
+            # Run the async screenshot capture
+            asyncio.run(
+                capture_screenshot_with_pilot(status_url, output_path, wait_time)
+            )
+
+        finally:
+            # Stop status server
+            print("Stopping status server...")
+            server.should_exit = True
+            server_thread.join(timeout=5)
+            print("Status server stopped")
 
 
 if __name__ == "__main__":
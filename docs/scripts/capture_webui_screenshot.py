@@ -15,81 +15,172 @@ Example:
 """
 
 import argparse
+import contextlib
 import socket
-import subprocess
+import threading
 import time
 
+import requests
 from playwright.sync_api import sync_playwright
 
 
-def find_available_port():
-    """Find an available port by binding to port 0."""
-    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-        s.bind(("", 0))
-        s.listen(1)
-        port = s.getsockname()[1]
-    return port
+@contextlib.contextmanager
+def reserve_port(port=0):
+    """Reserve ``port`` (default: any available port) by binding and holding it.
 
+    Yields ``(port, sock)``. The socket stays bound (with SO_REUSEADDR so a
+    server can rebind it straight away) until the caller closes it or hands it
+    to a server, so no other process can grab the port in the meantime.
+    """
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    try:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.bind(("127.0.0.1", port))
+        yield sock.getsockname()[1], sock
+    finally:
+        sock.close()
+
+
+def _wait_until_ready(url, timeout=15.0, server_thread=None):
+    """Poll ``url`` until it answers with HTTP 200, backing off exponentially.
+
+    Args:
+        url: Endpoint to poll (e.g. the ``/status`` route of the server)
+        timeout: Maximum number of seconds to wait before giving up
+        server_thread: Optional thread running the server; polling stops early
+          if it exits
+
+    Raises:
+        RuntimeError: If the server exits or does not become ready in time
+    """
+    deadline = time.monotonic() + timeout
+    attempt = 0
+    while True:
+        if server_thread is not None and not server_thread.is_alive():
+            raise RuntimeError("Server exited before becoming ready")
+        try:
+            if requests.get(url, timeout=1.0).status_code == 200:
+                return
+        except requests.RequestException:
+            pass
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise RuntimeError(f"Server at {url} not ready after {timeout:.1f}s")
+        time.sleep(min(0.05 * 2**attempt, 1.0, remaining))
+        attempt += 1
+
+
+def _screenshot_page(browser, url, output_path):
+    """Capture ``url`` to ``output_path`` in a fresh context of ``browser``.
+
+    Each capture gets its own BrowserContext, which is closed afterwards; the
+    browser itself is left running so it can be reused for further captures.
+    """
+    context = browser.new_context(viewport={"width": 1200, "height": 800})
+    try:
+        page = context.new_page()
+        page.goto(url, timeout=10000)
+
+        # Wait until the page and its first status/outputs fetches settle,
+        # then for web fonts so text is not captured mid-swap
+        page.wait_for_load_state("domcontentloaded")
+        page.wait_for_load_state("networkidle", timeout=5000)
+        page.evaluate("document.fonts.ready")
+
+        # Take screenshot
+        page.screenshot(path=output_path)
+        print(f"Screenshot saved to {output_path}")
+    except Exception as e:
+        print(f"Error capturing screenshot: {e}")
+        raise
+    finally:
+        context.close()
 
-def capture_webui_screenshot(flow_file, output_path, port=None):
-    """Start webui, capture screenshot, cleanup."""
 
-    # Find an available port if not specified
-    if port is None:
-        port = find_available_port()
+def capture_webui_screenshot(flow_file, output_path, port=None, browser=None):
+    """Start webui, capture screenshot, cleanup.
 
-    # Start webui server
-    print(f"Starting webui on port {port}...")
-    process = subprocess.Popen(
-        ["python", "-m", "flowtoy", "webui", flow_file, "--port", str(port)],
-        stdout=subprocess.PIPE,
-        stderr=subprocess.STDOUT,
-        text=True,
-    )
+    The flow and the webui run in this process: the server is handed the
+    already-bound socket from reserve_port(), so the port is never released
+    between reserving it and serving on it.
 
-    # Wait for server to start and flow to execute
-    print("Waiting for flow to execute...")
-    time.sleep(5)
+    Args:
+        flow_file: Path to flow YAML file
+        output_path: Path to save screenshot PNG
+        port: Port to run the webui on (default: reserve an available port)
+        browser: Optional already-launched Playwright browser to reuse; when
+          omitted a Chromium instance is launched just for this capture
+    """
+    import uvicorn
 
-    # Check if process is still running
-    if process.poll() is not None:
-        output, _ = process.communicate()
-        print(f"Server failed to start:\n{output}")
-        raise RuntimeError("Server failed to start")
+    from flowtoy.api import attach_runner
+    from flowtoy.config import load_yaml_files
+    from flowtoy.runner import LocalRunner
+    from flowtoy.webui import app as ui_app
 
-    try:
-        # Launch browser and capture screenshot
-        print(f"Capturing screenshot from http://127.0.0.1:{port}...")
-        with sync_playwright() as p:
-            browser = p.chromium.launch()
-            page = browser.new_page(viewport={"width": 1200, "height": 800})
+    with reserve_port(port or 0) as (port, sock):
+        print(f"Starting webui on port {port}...")
 
-            try:
-                page.goto(f"http://127.0.0.1:{port}", timeout=10000)
+        runner = LocalRunner(load_yaml_files([flow_file]))
+        attach_runner(runner)
+        server = uvicorn.Server(uvicorn.Config(ui_app, log_level="error"))
+        server_errors = []
 
-                # Wait for content to load
-                page.wait_for_selector("#steps", timeout=5000)
-                time.sleep(1)  # Extra time for any animations
+        def serve():
+            try:
+                server.run(sockets=[sock])
+            except BaseException as e:  # including SystemExit from uvicorn
+                server_errors.append(e)
 
-                # Take screenshot
-                page.screenshot(path=output_path)
-                print(f"Screenshot saved to {output_path}")
-            except Exception as e:
-                print(f"Error capturing screenshot: {e}")
-                raise
-            finally:
-                browser.close()
+        # Serve the webui on the reserved socket and run the flow
+        server_thread = threading.Thread(target=serve, daemon=True)
+        server_thread.start()
+        threading.Thread(target=runner.run, daemon=True).start()
 
-    finally:
-        # Stop server
-        print("Stopping server...")
-        process.terminate()
         try:
-            process.wait(timeout=5)
-        except subprocess.TimeoutExpired:
-            process.kill()
-            process.wait()
-        print("Server stopped")
+            print("Waiting for server to start...")
+            try:
+                _wait_until_ready(
+                    f"http://127.0.0.1:{port}/status", server_thread=server_thread
+                )
+            except RuntimeError as err:
+                detail = f": {server_errors[0]!r}" if server_errors else ""
+                raise RuntimeError(f"Server failed to start{detail}") from err
+
+            # Launch browser (unless one was provided) and capture screenshot
+            url = f"http://127.0.0.1:{port}"
+            print(f"Capturing screenshot from {url}...")
+            if browser is not None:
+                _screenshot_page(browser, url, output_path)
+            else:
+                with sync_playwright() as p:
+                    own_browser = p.chromium.launch()
+                    try:
+                        _screenshot_page(own_browser, url, output_path)
+                    finally:
+                        own_browser.close()
+
+        finally:
+            # Stop server
+            print("Stopping server...")
+            server.should_exit = True
+            server_thread.join(timeout=5)
+            print("Server stopped")
+
+
+def capture_webui_screenshots(jobs):
+    """Capture several ``(flow_file, output_path)`` pairs with one browser.
+
+    Launching Chromium dominates the cost of a single capture, so building
+    many doc images shares one browser and only opens a new context per image.
+    """
+    with sync_playwright() as p:
+        browser = p.chromium.launch()
+        try:
+            for flow_file, output_path in jobs:
+                capture_webui_screenshot(flow_file, output_path, browser=browser)
+        finally:
+            browser.close()
 
 
 if __name__ == "__main__":
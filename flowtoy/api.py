@@ -1,11 +1,34 @@
 from __future__ import annotations
 
 import threading
-from typing import Any, Optional
+from contextlib import asynccontextmanager, nullcontext
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Tuple
 
-from fastapi import FastAPI
+from anyio import to_thread
+from fastapi import FastAPI, Request, Response
+from fastapi.responses import StreamingResponse
 
-app = FastAPI()
+from .jsonutil import dumps, response_class
+
+# worker threads available to the sync (def) endpoints; Starlette's default of
+# 40 is easily exhausted when several UIs poll /status and /outputs at once
+API_THREADPOOL_SIZE = 200
+
+# longest a /status?since=N request waits for the status to change
+LONG_POLL_TIMEOUT = 25.0
+
+# how often an idle /outputs/stream checks for a gone client or server shutdown
+STREAM_CHECK_INTERVAL = 1.0
+
+
+@asynccontextmanager
+async def threadpool_lifespan(app: FastAPI) -> AsyncIterator[None]:
+    """Lifespan handler that sizes the event loop's endpoint threadpool."""
+    to_thread.current_default_thread_limiter().total_tokens = API_THREADPOOL_SIZE
+    yield
+
+
+app = FastAPI(default_response_class=response_class(), lifespan=threadpool_lifespan)
 
 # runtime-bound runner will be attached here
 _RUNNER: Optional[Any] = None
@@ -15,7 +38,7 @@ _RUNNER_LOCK = threading.RLock()
 def attach_runner(runner: Any):
     """Attach the given runner instance so the API can expose its live state.
 
-    This stores a reference under a lock to make concurrent reads safer.
+    The reference is swapped under a lock; readers just load the global.
     """
     global _RUNNER
     with _RUNNER_LOCK:
@@ -23,53 +46,201 @@ def attach_runner(runner: Any):
 
 
 def _get_runner() -> Optional[Any]:
-    with _RUNNER_LOCK:
-        return _RUNNER
+    # a single global read is atomic, so the hot request path takes no lock;
+    # the lock only serialises attach_runner calls
+    return _RUNNER
 
 
-@app.get("/status")
-def status():
-    r = _get_runner()
-    if r is None:
-        return {"status": "no-runner"}
+def status_etag(runner: Any) -> Optional[str]:
+    """Return an ETag for the runner's current status, if it tracks versions."""
+    version = getattr(runner.status, "version", None)
+    if version is None:
+        return None
+    return f'"{runner.status.run_id}-{version}"'
+
+
+def wait_for_version(
+    runner: Any, since: Optional[int], timeout: float = LONG_POLL_TIMEOUT
+) -> None:
+    """Long-poll support: wait until the runner's status version exceeds ``since``.
+
+    Returns immediately when ``since`` is None or the runner cannot signal
+    changes. On timeout the caller answers with the unchanged status (or a 304).
+    """
+    if since is None:
+        return
+    wait = getattr(runner, "wait_for_change", None)
+    if wait is not None:
+        wait(since, timeout)
+
+
+def shutdown_event(app: Any) -> threading.Event:
+    """Event set when the server hosting ``app`` starts shutting down.
+
+    Open ``/outputs/stream`` responses watch it and end, so the server does
+    not wait on them (see ``runner_api.StreamAwareServer``).
+    """
+    state = app.state
+    event = getattr(state, "shutdown", None)
+    if event is None:
+        event = state.shutdown = threading.Event()
+    return event
+
+
+async def output_events(
+    runner: Any,
+    request: Optional[Request] = None,
+    stop: Optional[threading.Event] = None,
+    timeout: float = LONG_POLL_TIMEOUT,
+) -> AsyncIterator[bytes]:
+    """Server-sent events carrying changes to the runner's outputs.
+
+    The first event holds all current outputs; each later one maps only the
+    steps whose outputs changed to their new outputs (``null`` if removed).
+    Each event's ``id`` is the status version read before the outputs, so the
+    outputs are at least as new as that version. A comment line is sent after
+    ``timeout`` idle seconds to keep the connection open. The runner must
+    provide ``wait_for_change``.
+
+    Changes are waited for in a worker thread in steps of at most
+    ``STREAM_CHECK_INTERVAL`` seconds; between steps the stream ends if
+    ``request``'s client has disconnected or ``stop`` is set.
+    """
+    sent: Dict[str, Any] = {}
+    first = True
+    while True:
+        # read the version first: a change after this point ends the wait below
+        version = runner.status.version
+        # published copy-on-write, so unchanged steps keep the same objects
+        flows = runner.flows
+        delta = {k: v for k, v in flows.items() if sent.get(k) is not v}
+        for k in sent.keys() - flows.keys():
+            delta[k] = None
+        if delta or first:
+            yield b"id: %d\ndata: " % version + dumps(delta) + b"\n\n"
+            first = False
+        sent = flows
+        idle = 0.0
+        while True:
+            if stop is not None and stop.is_set():
+                return
+            if request is not None and await request.is_disconnected():
+                return
+            wait = min(STREAM_CHECK_INTERVAL, timeout - idle)
+            if await to_thread.run_sync(runner.wait_for_change, version, wait):
+                break
+            idle += wait
+            if idle >= timeout:
+                yield b": keep-alive\n\n"
+                idle = 0.0
+
+
+def stream_outputs(runner: Any, request: Request) -> Response:
+    """``/outputs/stream`` response for ``runner``; 404 if it cannot signal changes."""
+    if getattr(runner, "wait_for_change", None) is None:
+        return Response(status_code=404)
+    return StreamingResponse(
+        output_events(runner, request, shutdown_event(request.app)),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache"},
+    )
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Whether the request's If-None-Match header already names ``etag``."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    return header.strip() == "*" or etag in (t.strip() for t in header.split(","))
+
+
+def snapshot_steps(runner: Any) -> Tuple[List[tuple], int, List[str]]:
+    """Copy per-step status fields in one critical section.
+
+    Returns ``(steps, completed, running_steps)`` where ``steps`` is
+    ``[(name, state, started_at, ended_at, error, outputs), ...]`` and
+    ``outputs`` holds the names of the step's published outputs. The payload is
+    then built from this snapshot without holding the runner's lock or racing
+    its updates.
+    """
+    lock = getattr(runner, "_lock", None)
+    status = runner.status
+    with lock if lock is not None else nullcontext():
+        steps = [
+            (k, v.state, v.started_at, v.ended_at, v.error, v.outputs)
+            for k, v in status.steps.items()
+        ]
+        # counters the runner keeps up to date on every state transition
+        completed = getattr(status, "completed", None)
+        running = getattr(status, "running", None)
+        running_steps = list(running) if running is not None else None
+    if completed is None:
+        completed = sum(1 for s in steps if s[1] in ("succeeded", "failed"))
+    if running_steps is None:
+        running_steps = [s[0] for s in steps if s[1] == "running"]
+    return steps, completed, running_steps
+
+
+class StatusCache:
+    """Serialized ``/status`` body, reused while the runner's version is unchanged.
+
+    Polls that arrive between status changes return the cached bytes instead
+    of rebuilding and re-encoding the payload.
+    """
+
+    __slots__ = ("_entry",)
+
+    def __init__(self) -> None:
+        self._entry: Optional[Tuple[Any, str, bytes]] = None
+
+    def respond(
+        self, runner: Any, request: Request, build: Callable[[Any], Dict[str, Any]]
+    ) -> Any:
+        # read the version before building the body so the ETag is never newer
+        # than the data it describes
+        etag = status_etag(runner)
+        if etag is None:
+            return build(runner)
+        # unchanged since the client's last poll: no body to build or send
+        if etag_matches(request, etag):
+            return Response(status_code=304, headers={"ETag": etag})
+        entry = self._entry
+        if entry is not None and entry[0] is runner and entry[1] == etag:
+            body = entry[2]
+        else:
+            body = dumps(build(runner))
+            self._entry = (runner, etag, body)
+        return Response(body, media_type="application/json", headers={"ETag": etag})
+
+
+_STATUS_CACHE = StatusCache()
+
+
+def build_status(r: Any) -> Dict[str, Any]:
+    """Build the ``/status`` payload for runner ``r``."""
     # build richer per-step info: include timestamps and available output keys
-    steps_info = {}
-    for k, v in r.status.steps.items():
-        outputs = {}
-        try:
-            # flows may be mutated concurrently; guard with getattr checks
-            outputs = (
-                list(r.flows.get(k, {}).keys())
-                if getattr(r, "flows", None) is not None
-                else []
-            )
-        except Exception:
-            outputs = []
-        steps_info[k] = {
-            "state": v.state,
-            "started_at": v.started_at,
-            "ended_at": v.ended_at,
-            "notes": ([v.error] if v.error else []),
-            "outputs": outputs,
+    # running_steps may hold several names when parallelism is enabled
+    steps, completed, running_steps = snapshot_steps(r)
+    steps_info = {
+        k: {
+            "state": state,
+            "started_at": started_at,
+            "ended_at": ended_at,
+            "notes": [error] if error else [],
+            "outputs": list(outputs),
         }
+        for k, state, started_at, ended_at, error, outputs in steps
+    }
 
-    # determine currently running steps (may be multiple when parallelism is enabled)
-    running_steps = [
-        name for name, info in steps_info.items() if info.get("state") == "running"
-    ]
     # keep a single current_step for backwards compat (first running step or None)
     current_step = running_steps[0] if running_steps else None
 
-    total = len(steps_info)
-    completed = sum(
-        1 for s in steps_info.values() if s.get("state") in ("succeeded", "failed")
-    )
-
     return {
         "run_id": r.status.run_id,
+        "version": r.status.version,
         "started_at": r.status.started_at,
         "ended_at": r.status.ended_at,
-        "total_steps": total,
+        "total_steps": len(steps),
         "completed_steps": completed,
         "current_step": current_step,
         "running_steps": running_steps,
@@ -78,10 +249,46 @@ def status():
     }
 
 
+def build_snapshot(r: Any) -> Dict[str, Any]:
+    """Build the ``/snapshot`` payload: status and outputs in one body."""
+    return {"status": build_status(r), "outputs": r.flows}
+
+
+_SNAPSHOT_CACHE = StatusCache()
+
+
+@app.get("/status")
+def status(request: Request, since: Optional[int] = None):
+    r = _get_runner()
+    if r is None:
+        return {"status": "no-runner"}
+    wait_for_version(r, since)
+    return _STATUS_CACHE.respond(r, request, build_status)
+
+
+@app.get("/snapshot")
+def snapshot(request: Request, since: Optional[int] = None):
+    r = _get_runner()
+    if r is None:
+        return {"status": {"status": "no-runner"}, "outputs": {}}
+    wait_for_version(r, since)
+    # the version covers outputs too, so the same ETag scheme applies
+    return _SNAPSHOT_CACHE.respond(r, request, build_snapshot)
+
+
+@app.get("/outputs/stream")
+def outputs_stream(request: Request):
+    r = _get_runner()
+    if r is None:
+        return Response(status_code=404)
+    return stream_outputs(r, request)
+
+
 @app.get("/outputs")
 def outputs():
     r = _get_runner()
     if r is None:
         return {}
-    # return a shallow copy to avoid concurrent mutation during JSON serialization
-    return dict(r.flows)
+    # the runner publishes a new flows dict per step instead of mutating it, so
+    # the current one can be serialized as-is without copying
+    return r.flows
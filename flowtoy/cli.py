@@ -1,24 +1,49 @@
 from __future__ import annotations
 
-import json
 import logging
+import sys
 import threading
-from typing import List, Optional, Tuple
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 import typer
-import uvicorn
 
-from .api import app, attach_runner
-from .config import load_yaml_files
-from .runner import LocalRunner
-from .runner_api import serve_runner_api_in_thread
-from .tui import run_tui
-from .webui import app as ui_app
+from .config import RUNNER_KEYS, load_yaml_files
+
+# The runner, FastAPI apps, uvicorn and Textual are imported inside the commands
+# that use them so `flowtoy help` and argument errors stay fast.
 
 cli = typer.Typer(
     name="flowtoy", context_settings={"help_option_names": ["-h", "--help"]}
 )
 
+_LOG_LEVELS = (logging.WARNING, logging.INFO, logging.DEBUG)
+
+# uvicorn settings for serve/webui, which mostly answer frequent small polls:
+# a deeper accept queue and a connection cap keep latency predictable under
+# many pollers (excess connections get a 503), and a longer keep-alive lets
+# once-a-second pollers reuse their connection. Access logs stay off.
+_UVICORN_OPTS: Dict[str, Any] = {
+    "backlog": 2048,
+    "limit_concurrency": 1024,
+    "timeout_keep_alive": 30,
+    "access_log": False,
+}
+
+
+@cli.callback()
+def configure(
+    verbose: int = typer.Option(
+        0, "--verbose", "-v", count=True, help="Log more (-v info, -vv debug)"
+    ),
+):
+    """flowtoy - minimal local-first flow runner."""
+    # logging is configured once here; without -v only warnings are emitted,
+    # so provider INFO messages are not formatted at all
+    logging.basicConfig(
+        level=_LOG_LEVELS[min(verbose, 2)], format="%(levelname)s %(name)s: %(message)s"
+    )
+
+
 HELP_TEXT = """
 flowtoy CLI
 
@@ -28,6 +53,7 @@ Commands:
   webui [CONFIG...]  Serve the UI and run the flow in background
 
 Options:
+  -v, --verbose         Log more (before the command; -vv for debug)
   -j, --json            Print outputs as JSON
   -o, --output-file     Write JSON outputs to file
   -q, --quiet           Suppress stdout printing
@@ -51,12 +77,48 @@ def h_cmd():
     typer.echo(HELP_TEXT)
 
 
+def _spawn_runner(
+    r,
+    on_done: Optional[Callable[[], None]] = None,
+    on_error: Optional[Callable[[Exception], None]] = None,
+) -> threading.Thread:
+    """Run ``r`` in a background thread while a server owns the main thread.
+
+    ``on_done`` is called in that thread once the flow has finished. If the
+    run raises, ``on_error`` is called with the exception instead (without
+    it, the exception propagates in the thread).
+    """
+
+    def _target():
+        try:
+            r.run()
+        except Exception as e:
+            if on_error is None:
+                raise
+            on_error(e)
+            return
+        if on_done is not None:
+            on_done()
+
+    t = threading.Thread(target=_target, name="flowtoy-runner")
+    t.start()
+    return t
+
+
+def _stop_runner(r, t: threading.Thread, timeout: float = 5.0) -> None:
+    """Let in-flight steps finish after the server exits, then wait briefly."""
+    r.request_stop()
+    t.join(timeout)
+
+
 def run_flow(config_paths: List[str]) -> Tuple[dict, object]:
     """Programmatic helper: load config, run the flow, and return (flows, status).
 
     Returns a tuple (flows_dict, status_object).
     """
-    cfg = load_yaml_files(config_paths)
+    from .runner import LocalRunner
+
+    cfg = load_yaml_files(config_paths, RUNNER_KEYS)
     r = LocalRunner(cfg)
     r.run()
     return r.flows, r.status
@@ -89,74 +151,100 @@ def run(
     max_workers: Optional[int] = run_max_workers_opt,
 ):
     """Run a flow from one or more YAML config files."""
+    from .api import attach_runner
+    from .runner import LocalRunner
+
     # create the runner, attach it so the API exposes the live instance, then run
-    cfg = load_yaml_files(config)
+    cfg = load_yaml_files(config, RUNNER_KEYS)
     logger = logging.getLogger(__name__)
-    # print a short summary to stdout so users can see what was loaded
-    flow_steps = cfg.get("flow") or []
-    logger.info(f"loaded config from {config}, flow steps: {len(flow_steps)}")
+    # log a short summary so users can see what was loaded
+    logger.info(
+        "loaded config from %s, flow steps: %d", config, len(cfg.get("flow") or ())
+    )
     r = LocalRunner(cfg)
     if max_workers:
         r._max_workers = int(max_workers)
     attach_runner(r)
 
+    def _emit_outputs():
+        flows = r.flows
+
+        if not quiet:
+            logger.info("run finished. outputs:")
+
+        if as_json or output_file:
+            from .jsonutil import dump_pretty
+
+            # written straight to the binary stream, so large outputs are
+            # never held as one big string
+            if output_file:
+                with open(output_file, "wb", buffering=1 << 20) as f:
+                    dump_pretty(flows, f)
+                if not quiet:
+                    logger.info("wrote outputs to %s", output_file)
+            else:
+                sys.stdout.flush()
+                dump_pretty(flows, sys.stdout.buffer)
+                sys.stdout.buffer.write(b"\n")
+                sys.stdout.flush()
+        else:
+            if not quiet:
+                print(flows)
+
+    if not status_port:
+        r.run()
+        _emit_outputs()
+        return
+
+    # with a status server, the flow runs in the background and the server
+    # owns the main thread; it keeps serving after the flow has finished so
+    # external UIs can poll the final state, until Ctrl-C or SIGTERM. If the
+    # run itself raises, the server is stopped and the error re-raised, so
+    # the command still fails as it does without a status server
+    from .runner_api import runner_api_server
+
     status_host = "127.0.0.1"
-    # optionally start a simple runner status server the UI can poll
-    if status_port:
-        # enable logging so provider diagnostics are visible
-        logging.basicConfig(level=logging.INFO)
-        serve_runner_api_in_thread(r, host=status_host, port=status_port)
+    server = runner_api_server(r, host=status_host, port=status_port)
+    failures: List[Exception] = []
 
-    r.run()
-    flows = r.flows
+    def _on_error(exc: Exception) -> None:
+        failures.append(exc)
+        server.should_exit = True
 
+    t = _spawn_runner(r, on_done=_emit_outputs, on_error=_on_error)
     if not quiet:
-        logger.info("run finished. outputs:")
-
-    if as_json or output_file:
-        payload = json.dumps(flows, indent=2)
-        if output_file:
-            with open(output_file, "w") as f:
-                f.write(payload)
-            if not quiet:
-                logger.info(f"wrote outputs to {output_file}")
-        else:
-            print(payload)
-    else:
-        if not quiet:
-            print(flows)
-    # If we started a status server, keep the process alive so external UIs can poll it
-    if status_port:
-        try:
-            if not quiet:
-                logger.info(
-                    "status server running on http://%s:%d (press Ctrl-C to exit)",
-                    status_host,
-                    status_port,
-                )
-            # block until interrupted
-            while True:
-                import time
-
-                time.sleep(1)
-        except KeyboardInterrupt:
-            if not quiet:
-                logger.info("shutting down")
+        logger.info(
+            "status server running on http://%s:%d (press Ctrl-C to exit)",
+            status_host,
+            status_port,
+        )
+    try:
+        server.run()
+    finally:
+        _stop_runner(r, t)
+    if failures:
+        raise failures[0]
 
 
 @cli.command()
 def serve(config: List[str], host: str = "127.0.0.1", port: int = 8000):
     """Serve the status API and run the flow once at startup."""
-    cfg = load_yaml_files(config)
+    import uvicorn
+
+    from .api import app, attach_runner
+    from .runner import LocalRunner
+    from .runner_api import StreamAwareServer
+
+    cfg = load_yaml_files(config, RUNNER_KEYS)
     r = LocalRunner(cfg)
     attach_runner(r)
 
-    def _run():
-        r.run()
-
-    t = threading.Thread(target=_run, daemon=True)
-    t.start()
-    uvicorn.run(app, host=host, port=port)
+    t = _spawn_runner(r)
+    try:
+        server_config = uvicorn.Config(app, host=host, port=port, **_UVICORN_OPTS)
+        StreamAwareServer(server_config).run()
+    finally:
+        _stop_runner(r, t)
 
 
 def main():
@@ -184,6 +272,8 @@ def tui(
     1. All-in-one: flowtoy tui flow.yaml (runs flow and monitors it)
     2. External: flowtoy tui --status-url http://... (monitors remote flow)
     """
+    from .tui import run_tui
+
     # Mode 1: All-in-one - run flow and monitor it
     if config:
         if status_url:
@@ -192,53 +282,46 @@ def tui(
             )
             raise typer.Exit(1)
 
-        # Find available port
-        import socket
-
-        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-            s.bind(("127.0.0.1", 0))
-            s.listen(1)
-            port = s.getsockname()[1]
+        from .api import attach_runner
+        from .runner import LocalRunner
+        from .runner_api import LogCapture, serve_runner_api_in_thread
 
         # Load config and start runner
-        cfg = load_yaml_files(config)
+        cfg = load_yaml_files(config, RUNNER_KEYS)
         r = LocalRunner(cfg)
         if max_workers:
             r._max_workers = int(max_workers)
         attach_runner(r)
 
         # Create log capture if --show-logs is enabled
-        from .runner_api import LogCapture
-
         log_capture = LogCapture(maxlen=100) if show_logs else None
 
-        # Start status server in background (capture logs if requested)
+        # Start status server on a free port (capture logs if requested)
         if log_capture:
-            serve_runner_api_in_thread(
+            port = serve_runner_api_in_thread(
                 r,
                 host="127.0.0.1",
-                port=port,
+                port=0,
                 log_level="info",
                 log_capture=log_capture,
             )
         else:
-            serve_runner_api_in_thread(
-                r, host="127.0.0.1", port=port, log_level="error"
+            port = serve_runner_api_in_thread(
+                r, host="127.0.0.1", port=0, log_level="error"
             )
 
         # Run flow in background thread
-        def _run():
-            r.run()
-
-        t = threading.Thread(target=_run, daemon=True)
-        t.start()
+        t = _spawn_runner(r)
 
         # Run TUI monitoring the local status server
-        run_tui(
-            status_url=f"http://127.0.0.1:{port}/status",
-            show_logs=show_logs,
-            log_capture=log_capture,
-        )
+        try:
+            run_tui(
+                status_url=f"http://127.0.0.1:{port}/status",
+                show_logs=show_logs,
+                log_capture=log_capture,
+            )
+        finally:
+            _stop_runner(r, t)
 
     # Mode 2: External monitoring
     else:
@@ -279,6 +362,10 @@ def webui(
     1. All-in-one: flowtoy webui flow.yaml (runs flow and serves UI)
     2. External: flowtoy webui --status-url http://... (serves UI for remote flow)
     """
+    import uvicorn
+
+    from .webui import app as ui_app
+
     # Mode 1: External monitoring - serve UI for remote flow
     if status_url:
         if config:
@@ -292,7 +379,7 @@ def webui(
 
         os.environ["RUNNER_STATUS_URL"] = status_url
 
-        uvicorn.run(ui_app, host=host, port=port)
+        uvicorn.run(ui_app, host=host, port=port, **_UVICORN_OPTS)
 
     # Mode 2: All-in-one - run flow and serve UI
     else:
@@ -302,22 +389,21 @@ def webui(
             )
             raise typer.Exit(1)
 
-        # enable basic INFO logging so provider logs are visible in the demo
-        logging.basicConfig(level=logging.INFO)
-        cfg = load_yaml_files(config)
+        from .api import attach_runner
+        from .runner import LocalRunner
+
+        cfg = load_yaml_files(config, RUNNER_KEYS)
         r = LocalRunner(cfg)
         if max_workers:
             r._max_workers = int(max_workers)
         attach_runner(r)
         # if STATUS_PORT env var or option is set via CLI later, we could also start
         # a standalone runner status server; keep it simple for now and attach to API
-
-        def _run():
-            r.run()
-
-        t = threading.Thread(target=_run, daemon=True)
-        t.start()
-        uvicorn.run(ui_app, host=host, port=port)
+        t = _spawn_runner(r)
+        try:
+            uvicorn.run(ui_app, host=host, port=port, **_UVICORN_OPTS)
+        finally:
+            _stop_runner(r, t)
 
 
 if __name__ == "__main__":
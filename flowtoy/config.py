@@ -1,28 +1,95 @@
 from __future__ import annotations
 
 import copy
-from typing import Any, Dict, List
+import os
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
 import yaml
 
+# libyaml's C loader when PyYAML was built with it; same safe subset of YAML
+_YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
 
-def load_yaml_files(paths: List[str]) -> Dict[str, Any]:
+# parsed documents keyed by absolute path, tagged with the (mtime_ns, size) they
+# were parsed at so an edited file is re-read. Cached trees are never handed
+# out directly: deep_merge always copies them.
+_YAML_CACHE: Dict[str, Tuple[Tuple[int, int], Any]] = {}
+# serve/webui threads may load config concurrently; parse each file only once
+_YAML_CACHE_LOCK = threading.Lock()
+
+
+def _load_yaml(path: str) -> Any:
+    key = os.path.abspath(path)
+    st = os.stat(key)
+    stamp = (st.st_mtime_ns, st.st_size)
+    with _YAML_CACHE_LOCK:
+        cached = _YAML_CACHE.get(key)
+        if cached is not None and cached[0] == stamp:
+            return cached[1]
+        # PyYAML decodes bytes itself (honouring a BOM), so skip the text IO layer
+        with open(key, "rb") as f:
+            data = yaml.load(f.read(), Loader=_YAML_LOADER) or {}
+        _YAML_CACHE[key] = (stamp, data)
+    return data
+
+
+# top-level sections LocalRunner reads; everything else is ignored by a run
+RUNNER_KEYS = ("flow", "sources", "runner")
+
+
+def load_yaml_files(
+    paths: List[str], keys: Optional[Iterable[str]] = None
+) -> Dict[str, Any]:
+    """Load and deep-merge YAML files, later files overriding earlier ones.
+
+    Args:
+        paths: YAML files to load, in merge order
+        keys: If given, only these top-level sections are merged (e.g.
+          ``RUNNER_KEYS``); other branches are neither copied nor merged
+    """
+    wanted = frozenset(keys) if keys is not None else None
     merged: Dict[str, Any] = {}
     for p in paths:
-        with open(p, "r", encoding="utf-8") as f:
-            data = yaml.safe_load(f) or {}
+        data = _load_yaml(p)
+        if wanted is not None:
+            data = {k: v for k, v in data.items() if k in wanted}
         merged = deep_merge(merged, data)
     return merged
 
 
+# immutable scalars YAML produces; shared by reference instead of copied
+_LEAF_TYPES = (str, int, float, bool, type(None))
+
+
+def _copy_tree(v: Any) -> Any:
+    """Copy the dict/list containers of ``v``, sharing immutable leaves."""
+    if isinstance(v, _LEAF_TYPES):
+        return v
+    if isinstance(v, dict):
+        return {k: _copy_tree(x) for k, x in v.items()}
+    if isinstance(v, list):
+        return [_copy_tree(x) for x in v]
+    return copy.deepcopy(v)
+
+
 def deep_merge(a: Dict[str, Any], b: Dict[str, Any]) -> Dict[str, Any]:
-    """Deep-merge dict b into a and return the result (new dict)."""
-    out = copy.deepcopy(a)
-    for k, v in (b or {}).items():
-        if k in out and isinstance(out[k], dict) and isinstance(v, dict):
-            out[k] = deep_merge(out[k], v)
+    """Deep-merge dict b into a and return the result (new dict).
+
+    Neither input is modified and the result shares no mutable containers
+    with them; only immutable scalars are shared.
+    """
+    b = b or {}
+    out: Dict[str, Any] = {}
+    for k, v in a.items():
+        if k not in b:
+            out[k] = _copy_tree(v)
+        elif isinstance(v, dict) and isinstance(b[k], dict):
+            out[k] = deep_merge(v, b[k])
         else:
-            out[k] = copy.deepcopy(v)
+            out[k] = _copy_tree(b[k])
+    for k, v in b.items():
+        if k not in a:
+            out[k] = _copy_tree(v)
     return out
 
 
@@ -0,0 +1,110 @@
+"""JSON helpers that use orjson when it is installed.
+
+orjson is an optional speedup (``pip install flowtoy[fast]``); without it
+everything falls back to the standard library ``json`` module. Documents
+orjson cannot handle the way ``json`` does (integers wider than 64 bits,
+``NaN`` in input) are also handed to ``json``, and both paths write non-ASCII
+text as UTF-8. One difference remains: non-finite floats (``nan``, ``inf``)
+are written as ``null`` by orjson but as the non-standard ``NaN``/``Infinity``
+tokens by ``json``.
+"""
+
+from __future__ import annotations
+
+import codecs
+import json
+import re
+from functools import lru_cache
+from typing import IO, Any, Type, Union
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - exercised when orjson is absent
+    orjson = None  # type: ignore[assignment]
+
+
+# a run of 20+ digits may be an integer beyond 64 bits, which orjson would
+# silently parse as a float; such documents go to json (digits in strings or
+# long fractions just take the slower path)
+_WIDE_DIGITS_BYTES = re.compile(rb"[0-9]{20}")
+_WIDE_DIGITS_STR = re.compile(r"[0-9]{20}")
+
+
+def loads(data: Union[str, bytes, bytearray]) -> Any:
+    """Parse a JSON document from text or (UTF-8) bytes."""
+    if isinstance(data, str):
+        wide = _WIDE_DIGITS_STR.search(data) is not None
+    else:
+        wide = _WIDE_DIGITS_BYTES.search(data) is not None
+    if orjson is not None and not wide:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            # orjson is stricter than json (e.g. NaN); let json decide
+            pass
+    return json.loads(data)
+
+
+def dumps(obj: Any) -> bytes:
+    """Serialize ``obj`` as compact UTF-8 JSON bytes."""
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+        except TypeError:
+            # e.g. integers wider than 64 bits; json handles those
+            pass
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def dumps_pretty(obj: Any) -> str:
+    """Serialize ``obj`` as JSON indented by two spaces.
+
+    Non-ASCII text is written as is rather than as ``\\u`` escapes.
+    """
+    if orjson is not None:
+        try:
+            return orjson.dumps(
+                obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS
+            ).decode("utf-8")
+        except TypeError:
+            # e.g. integers wider than 64 bits; json handles those
+            pass
+    return json.dumps(obj, ensure_ascii=False, indent=2)
+
+
+def dump_pretty(obj: Any, fp: IO[bytes]) -> None:
+    """Write ``obj`` to the binary file ``fp`` as JSON indented by two spaces.
+
+    Produces the same text as ``dumps_pretty`` without building it as a
+    ``str`` first; the stdlib fallback streams the document in chunks.
+    """
+    if orjson is not None:
+        try:
+            fp.write(
+                orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+            )
+            return
+        except TypeError:
+            # e.g. integers wider than 64 bits; json handles those
+            pass
+    json.dump(obj, codecs.getwriter("utf-8")(fp), ensure_ascii=False, indent=2)
+
+
+@lru_cache(maxsize=None)
+def response_class() -> Type[Any]:
+    """FastAPI response class for JSON bodies, rendered by orjson if available.
+
+    Defined here rather than using fastapi's ORJSONResponse, which newer
+    FastAPI releases deprecate. Imported lazily so providers that only parse
+    JSON don't pull in the web stack.
+    """
+    from fastapi.responses import JSONResponse
+
+    if orjson is None:
+        return JSONResponse
+
+    class ORJSONResponse(JSONResponse):
+        def render(self, content: Any) -> bytes:
+            return dumps(content)
+
+    return ORJSONResponse
@@ -9,17 +9,44 @@ This module exposes:
 
 - discover_entry_points()
   finds providers registered via entry points
+
+- clear_cache()
+  forgets resolved constructors and discovered entry points
 """
 
 from __future__ import annotations
 
-from importlib.metadata import entry_points
-from typing import Any, Callable, Dict
+import importlib
+import logging
+import threading
+from functools import lru_cache
+from importlib.metadata import EntryPoint, entry_points
+from typing import Any, Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Built-in providers, used when the package metadata (and so its entry points)
+# is unavailable, e.g. when running from a source checkout
+_BUILTIN_PROVIDERS: Dict[str, str] = {
+    "rest": "flowtoy.providers.rest:RestProvider",
+    "process": "flowtoy.providers.process:ProcessProvider",
+    "env": "flowtoy.providers.env:EnvProvider",
+}
 
 # Track if entry points have been discovered
 _entry_points_discovered = False
-# Cache for discovered entry points
-_entry_point_providers: Dict[str, Callable[[dict], Any]] = {}
+# Discovered (not yet loaded) entry points by provider name
+_entry_point_specs: Dict[str, EntryPoint] = {}
+# Constructors resolved so far; each provider is imported on first request only
+_ctor_cache: Dict[str, Callable[[dict], Any]] = {}
+# serialises discovery and resolution; cache hits in create_provider skip it
+_REG_LOCK = threading.Lock()
+
+
+@lru_cache(maxsize=None)
+def _provider_entry_points() -> Tuple[EntryPoint, ...]:
+    # scanning installed distributions' metadata is slow; do it once per process
+    return tuple(entry_points(group="flowtoy.providers"))
 
 
 def discover_entry_points() -> Dict[str, Callable[[dict], Any]]:
@@ -29,54 +56,87 @@ def discover_entry_points() -> Dict[str, Callable[[dict], Any]]:
     Entry points should be registered in the 'flowtoy.providers' group.
     """
     discovered = {}
-    try:
-        # Python 3.10+ API
-        eps = entry_points(group="flowtoy.providers")
-    except TypeError:
-        # Python 3.9 fallback - entry_points() returns SelectableGroups
-        all_eps = entry_points()
-        # SelectableGroups allows dictionary-style access
-        eps = all_eps["flowtoy.providers"] if "flowtoy.providers" in all_eps else []
-
-    for ep in eps:
+    for ep in _provider_entry_points():
         try:
             provider_class = ep.load()  # type: ignore
             discovered[ep.name] = provider_class  # type: ignore
         except Exception as e:
             # Log but don't fail if a provider can't load
-            import sys
-
-            print(
-                f"Warning: Failed to load provider '{ep.name}': {e}",
-                file=sys.stderr,
-            )
+            logger.warning("Failed to load provider %r: %s", ep.name, e)
 
     return discovered
 
 
+def _from_entry_point(type_name: str) -> Optional[Callable[[dict], Any]]:
+    global _entry_points_discovered
+
+    # Discover provider names on first use; nothing is imported yet
+    if not _entry_points_discovered:
+        _entry_point_specs.update({ep.name: ep for ep in _provider_entry_points()})
+        _entry_points_discovered = True
+
+    ep = _entry_point_specs.get(type_name)
+    return ep.load() if ep is not None else None
+
+
+def _from_builtin(type_name: str) -> Optional[Callable[[dict], Any]]:
+    spec = _BUILTIN_PROVIDERS.get(type_name)
+    if spec is None:
+        return None
+    module, _, attr = spec.partition(":")
+    return getattr(importlib.import_module(module), attr)
+
+
+# tried in order; the first resolver that knows the type wins
+_RESOLVERS: Tuple[Callable[[str], Optional[Callable[[dict], Any]]], ...] = (
+    _from_entry_point,
+    _from_builtin,
+)
+
+
+def _resolve_provider(type_name: str) -> Callable[[dict], Any]:
+    with _REG_LOCK:
+        # another runner thread may have resolved it while we waited
+        ctor = _ctor_cache.get(type_name)
+        if ctor is not None:
+            return ctor
+        for resolve in _RESOLVERS:
+            ctor = resolve(type_name)
+            if ctor is not None:
+                _ctor_cache[type_name] = ctor
+                return ctor
+    available = ", ".join(sorted(set(_entry_point_specs) | set(_BUILTIN_PROVIDERS)))
+    raise ImportError(
+        f"Unknown provider type '{type_name}'. Available providers: {available}"
+    )
+
+
 def create_provider(type_name: str, configuration: dict):
     """Create an instance of the named provider.
 
     Providers are loaded via entry points in the 'flowtoy.providers' group.
     This applies to both built-in and third-party providers.
 
-    Providers are only imported when first requested (lazy loading).
+    Providers are only imported when first requested (lazy loading); the
+    resolved constructor is cached so later calls are a single dict lookup.
     """
-    global _entry_points_discovered
+    ctor = _ctor_cache.get(type_name)
+    if ctor is None:
+        ctor = _resolve_provider(type_name)
+    return ctor(configuration)
 
-    # Discover all providers on first use
-    if not _entry_points_discovered:
-        discovered = discover_entry_points()
-        _entry_point_providers.update(discovered)
-        _entry_points_discovered = True
 
-    if type_name not in _entry_point_providers:
-        available = ", ".join(sorted(_entry_point_providers.keys()))
-        raise ImportError(
-            f"Unknown provider type '{type_name}'. Available providers: {available}"
-        )
+def clear_cache() -> None:
+    """Forget resolved provider constructors and discovered entry points.
 
-    return _entry_point_providers[type_name](configuration)
+    Mainly useful in tests that install or monkeypatch providers.
+    """
+    global _entry_points_discovered
+    with _REG_LOCK:
+        _ctor_cache.clear()
+        _entry_point_specs.clear()
+        _entry_points_discovered = False
+        _provider_entry_points.cache_clear()
 
 
-__all__ = ["create_provider", "discover_entry_points"]
+__all__ = ["clear_cache", "create_provider", "discover_entry_points"]
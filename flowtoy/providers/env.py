@@ -14,5 +14,7 @@ class EnvProvider:
 
     def call(self, input_payload: Optional[Any] = None) -> Any:
         vars = self.configuration.get("vars", [])
-        data = {k: os.environ.get(k) for k in vars}
+        # bind the mapping once rather than resolving os.environ per variable
+        environ = os.environ
+        data = {k: environ.get(k) for k in vars}
         return make_result(success=True, code=0, data=data, notes=[], meta={})
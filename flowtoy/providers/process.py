@@ -1,23 +1,238 @@
 from __future__ import annotations
 
-import json
+import asyncio
+import atexit
+import functools
 import logging
+import os
+import re
+import select
 import shlex
 import subprocess
+import threading
 import time as _time
-from typing import Any, Dict, Optional
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 import jinja2
-import jmespath
 
+from ..jsonutil import loads as json_loads
+from ..templating import compile_jmespath
 from .result import make_result, result_from_exception
 
+logger = logging.getLogger(__name__)
+
+
+# shared template environments for pass_to: template; missing variables raise
+# under the strict one. They are never mutated after creation, so compiled
+# templates can be shared by every provider instance and thread.
+_STRICT_ENV = jinja2.Environment(undefined=jinja2.StrictUndefined)
+_LAX_ENV = jinja2.Environment(undefined=jinja2.Undefined)
+
+
+@functools.lru_cache(maxsize=256)
+def _split_cmd(cmd: str) -> Tuple[str, ...]:
+    # commands come from static config, so each string is tokenized once
+    return tuple(shlex.split(cmd))
+
+
+@functools.lru_cache(maxsize=512)
+def _compile_arg(strict: bool, source: str) -> jinja2.Template:
+    return (_STRICT_ENV if strict else _LAX_ENV).from_string(source)
+
+
+# record separator used to fuse all args into one template; a command line
+# practically never contains it, and _arg_renderer checks the context for it
+_ARG_SEP = "\x1e"
+# whitespace control ({{- ... -}}) could strip a separator (\x1e counts as
+# whitespace), so args using it are rendered one by one
+_WS_CONTROL = ("{{-", "-}}", "{%-", "-%}")
+
+
+def _is_literal(arg: str) -> bool:
+    # renders to itself: no template syntax, and no newlines for Jinja to
+    # normalise or strip
+    return "{" not in arg and "\n" not in arg and "\r" not in arg
+
+
+def _contains_sep(value: Any) -> bool:
+    """Whether any string in ``value`` (searched through dicts and lists)
+    contains ``_ARG_SEP``."""
+    if isinstance(value, str):
+        return _ARG_SEP in value
+    if isinstance(value, dict):
+        return any(_contains_sep(k) or _contains_sep(v) for k, v in value.items())
+    if isinstance(value, (list, tuple)):
+        return any(_contains_sep(v) for v in value)
+    return False
+
+
+@functools.lru_cache(maxsize=256)
+def _arg_renderer(
+    strict: bool, args: Tuple[str, ...]
+) -> Callable[[Dict[str, Any]], List[str]]:
+    """Prepare rendering every arg of a command as a template.
+
+    Literal args are copied as-is. When every template arg is a plain
+    expression template, they are joined with a separator and rendered as one
+    template, so each call does one render instead of one per arg; when a
+    value in the context contains the separator they are rendered
+    individually. Args using statements (``{% ... %}``, whose
+    variables would leak into later args) or ending in a newline (which Jinja
+    strips only at the end of a whole template) are always rendered one by
+    one. All of this is decided once per command, since commands come from
+    static config.
+    """
+    positions = [i for i, a in enumerate(args) if not _is_literal(a)]
+    if not positions:
+        return lambda ctx: list(args)
+    templates = [args[i] for i in positions]
+
+    def render_each(ctx: Dict[str, Any]) -> List[str]:
+        out = list(args)
+        for i in positions:
+            out[i] = _compile_arg(strict, args[i]).render(ctx)
+        return out
+
+    combined = _ARG_SEP.join(templates)
+    if (
+        len(templates) == 1
+        or combined.count(_ARG_SEP) != len(templates) - 1
+        or any(w in combined for w in _WS_CONTROL)
+        or "{%" in combined
+        or any(t.endswith(("\n", "\r")) for t in templates)
+    ):
+        return render_each
+
+    fused = _compile_arg(strict, combined)
+
+    def render_fused(ctx: Dict[str, Any]) -> List[str]:
+        if _contains_sep(ctx):
+            return render_each(ctx)
+        parts = fused.render(ctx).split(_ARG_SEP)
+        if len(parts) != len(positions):
+            return render_each(ctx)
+        out = list(args)
+        for i, part in zip(positions, parts, strict=True):
+            out[i] = part
+        return out
+
+    return render_fused
+
+
+# characters a JSON document can start with (after optional whitespace/BOM);
+# output starting with anything else can't parse, so parsing is skipped
+_JSON_START_BYTES = re.compile(rb'(?:\xef\xbb\xbf)?[ \t\n\r]*[\[{"\-0-9tfnNI]')
+_JSON_START_STR = re.compile(r'\ufeff?[ \t\n\r]*[\[{"\-0-9tfnNI]')
+
+
+def _looks_like_json(out: Any) -> bool:
+    if isinstance(out, (bytes, bytearray)):
+        return _JSON_START_BYTES.match(out) is not None
+    if isinstance(out, str):
+        return _JSON_START_STR.match(out) is not None
+    return False
+
+
+@functools.lru_cache(maxsize=128)
+def _compile_redact_patterns(patterns: Tuple[str, ...]) -> re.Pattern:
+    # one alternation regex replaces a Python-level substring test per pattern
+    return re.compile("|".join(re.escape(p) for p in patterns))
+
+
+class _Worker:
+    """A long-running command answering length-prefixed requests.
+
+    Each request is written to the command's stdin as a 4-byte little-endian
+    length followed by the payload; the reply comes back on stdout framed the
+    same way. Callers hold ``lock`` for a whole request.
+    """
+
+    def __init__(self, cmd: Tuple[str, ...]):
+        # stderr is inherited: an unread pipe could fill up and stall the worker
+        self.proc = subprocess.Popen(
+            cmd, stdin=subprocess.PIPE, stdout=subprocess.PIPE, bufsize=0
+        )
+        self.lock = threading.Lock()
+
+    def request(self, payload: bytes, timeout: Optional[float]) -> bytes:
+        assert self.proc.stdin is not None
+        self.proc.stdin.write(len(payload).to_bytes(4, "little") + payload)
+        deadline = None if timeout is None else _time.monotonic() + timeout
+        size = int.from_bytes(self._read(4, deadline, timeout), "little")
+        return self._read(size, deadline, timeout)
+
+    def _read(
+        self, n: int, deadline: Optional[float], timeout: Optional[float]
+    ) -> bytes:
+        assert self.proc.stdout is not None
+        fd = self.proc.stdout.fileno()
+        buf = bytearray()
+        while len(buf) < n:
+            # waiting on a pipe with select is POSIX-only; without a timeout
+            # the read simply blocks
+            if deadline is not None:
+                # the deadline is only set when a timeout is
+                assert timeout is not None
+                remaining = deadline - _time.monotonic()
+                if remaining <= 0 or not select.select([fd], [], [], remaining)[0]:
+                    raise subprocess.TimeoutExpired(self.proc.args, timeout)
+            chunk = os.read(fd, n - len(buf))
+            if not chunk:
+                raise EOFError(
+                    f"persistent process exited (returncode={self.proc.poll()})"
+                )
+            buf += chunk
+        return bytes(buf)
+
+    def close(self) -> None:
+        # EOF on stdin asks the worker to exit; kill it if it does not
+        try:
+            if self.proc.stdin is not None:
+                self.proc.stdin.close()
+            self.proc.wait(timeout=1)
+        except Exception:
+            self.proc.kill()
+            self.proc.wait()
+
+
+# persistent workers by command, shared by every provider instance and thread
+_WORKERS: Dict[Tuple[str, ...], _Worker] = {}
+_WORKERS_LOCK = threading.Lock()
+
+
+def _get_worker(cmd: Tuple[str, ...]) -> _Worker:
+    with _WORKERS_LOCK:
+        worker = _WORKERS.get(cmd)
+        if worker is None or worker.proc.poll() is not None:
+            worker = _WORKERS[cmd] = _Worker(cmd)
+        return worker
+
+
+def _discard_worker(cmd: Tuple[str, ...], worker: _Worker) -> None:
+    # after a failed or timed-out request the framing can't be trusted, so
+    # the worker is replaced on the next call
+    with _WORKERS_LOCK:
+        if _WORKERS.get(cmd) is worker:
+            del _WORKERS[cmd]
+    worker.proc.kill()
+    worker.proc.wait()
+
+
+@atexit.register
+def _close_workers() -> None:
+    with _WORKERS_LOCK:
+        workers = list(_WORKERS.values())
+        _WORKERS.clear()
+    for worker in workers:
+        worker.close()
+
 
 class ProcessProvider:
     type_name = "process"
 
     def __init__(self, configuration: Dict[str, Any]):
         self.configuration = configuration or {}
+        self._redact_indices = frozenset(self.configuration.get("redact_args") or ())
 
     def _sanitize_for_logging(self, cmd_list: list, cfg: Dict[str, Any]) -> list:
         """Sanitize command arguments for logging based on configuration.
@@ -50,29 +265,39 @@ class ProcessProvider:
                 return cmd_list
             return [cmd_list[0], f"<{len(cmd_list) - 1} args>"]
 
-        # User has configured specific redaction
+        # User has configured specific redaction; the index set for our own
+        # configuration is built once in __init__
+        index_set = (
+            self._redact_indices
+            if cfg is self.configuration
+            else frozenset(redact_indices or ())
+        )
+        pattern_re = (
+            _compile_redact_patterns(tuple(str(p) for p in redact_patterns))
+            if redact_patterns
+            else None
+        )
         sanitized = []
         for i, arg in enumerate(cmd_list):
-            arg_str = str(arg)
-
             # Check if this index should be redacted
-            if redact_indices and i in redact_indices:
+            if i in index_set:
                 sanitized.append("[REDACTED]")
                 continue
 
             # Check if this arg matches any redaction patterns
-            if redact_patterns:
-                should_redact = any(pattern in arg_str for pattern in redact_patterns)
-                if should_redact:
-                    sanitized.append("[REDACTED]")
-                    continue
+            if pattern_re is not None and pattern_re.search(str(arg)):
+                sanitized.append("[REDACTED]")
+                continue
 
             # No redaction needed for this arg
             sanitized.append(arg)
 
         return sanitized
 
-    def call(self, input_payload: Optional[Any] = None) -> Any:
+    def _build_command(
+        self, input_payload: Optional[Any]
+    ) -> Tuple[List[str], Optional[bytes]]:
+        """Build the argument list and stdin bytes for one invocation."""
         cfg = self.configuration or {}
         cmd = cfg.get("command")
         if cmd is None:
@@ -80,7 +305,7 @@ class ProcessProvider:
 
         # normalize command into a list
         if isinstance(cmd, str):
-            cmd_list = shlex.split(cmd)
+            cmd_list = list(_split_cmd(cmd))
         else:
             cmd_list = list(cmd)
 
@@ -99,17 +324,14 @@ class ProcessProvider:
                 # append as final arg
                 cmd_list.append(str(input_payload))
         elif pass_to == "template":
-            # prepare jinja2 environment with StrictUndefined (missing
-            # variables should raise)
-            template_strict = cfg.get("template_strict", True)
-            undefined = jinja2.StrictUndefined if template_strict else jinja2.Undefined
-            env = jinja2.Environment(undefined=undefined)
+            # missing variables raise unless template_strict is disabled
+            template_strict = bool(cfg.get("template_strict", True))
 
             # try to parse input as json for jmespath queries (only if provided
             # and looks like text)
             try:
                 parsed_json = (
-                    json.loads(input_payload)
+                    json_loads(input_payload)
                     if input_payload is not None
                     and isinstance(input_payload, (str, bytes, bytearray))
                     else None
@@ -121,40 +343,137 @@ class ProcessProvider:
             def _jmespath(expr):
                 if parsed_json is None:
                     return None
-                return jmespath.search(expr, parsed_json)
-
-            env.globals["jmespath"] = _jmespath
+                return compile_jmespath(expr).search(parsed_json)
 
-            # context available to templates
+            # context available to templates; the jmespath helper is passed per
+            # render rather than via env.globals so the shared environments
+            # are never mutated
             ctx = {
                 "raw": str(input_payload),
                 "input": input_payload,
                 "json": parsed_json,
+                "jmespath": _jmespath,
             }
 
             # render each arg as a template (render even if input_payload is
             # None so missing vars raise)
-            rendered = []
-            for a in cmd_list:
-                try:
-                    tmpl = env.from_string(a)
-                    rendered_arg = tmpl.render(ctx)
-                except jinja2.exceptions.UndefinedError:
-                    # re-raise to respect strict undefined behaviour
-                    raise
-                rendered.append(rendered_arg)
-            cmd_list = rendered
+            cmd_list = _arg_renderer(template_strict, tuple(cmd_list))(ctx)
         else:
             # unknown pass_to - fall back to arg behaviour
             if input_payload is not None:
                 cmd_list.append(str(input_payload))
 
+        return cmd_list, input_bytes
+
+    def _timeout_result(self, exc: Exception) -> Dict[str, Any]:
+        # Return structured error result for timeouts (runtime failure)
+        return make_result(
+            success=False,
+            code=None,
+            data=None,
+            notes=["timeout"],
+            meta={"timeout": True, "exception": str(exc)},
+        )
+
+    def _build_result(
+        self,
+        log_cmd: Optional[list],
+        returncode: int,
+        stdout: Any,
+        stderr: Any,
+        start_ts: float,
+    ) -> Dict[str, Any]:
+        """Decode process output and wrap it in the canonical result shape."""
+        stderr = (
+            stderr.decode("utf-8", errors="ignore")
+            if isinstance(stderr, (bytes, bytearray))
+            else stderr
+        )
+
+        # try to parse stdout as json; the parser accepts bytes directly, so
+        # stdout is only decoded to text when it turns out not to be JSON.
+        # parse_json: "auto" (default) only tries output that can start a JSON
+        # document, "always" tries everything, "never" keeps raw text
+        meta = {"stderr": stderr, "returncode": returncode}
+        parse_json = (self.configuration or {}).get("parse_json", "auto")
+        data = None
+        parsed = False
+        if parse_json == "always" or (
+            parse_json != "never" and _looks_like_json(stdout)
+        ):
+            try:
+                data = json_loads(stdout)
+                parsed = True
+            except Exception:
+                pass
+        if not parsed:
+            data = (
+                stdout.decode("utf-8", errors="ignore")
+                if isinstance(stdout, (bytes, bytearray))
+                else stdout
+            )
+
+        notes = [] if returncode == 0 else [f"process exited with code {returncode}"]
+        # log_cmd is only built when INFO logging is enabled
+        if log_cmd is not None:
+            logger.info(
+                "ProcessProvider finished command: %s returncode=%s elapsed=%.3fs",
+                log_cmd,  # Use sanitized version
+                returncode,
+                _time.monotonic() - start_ts,
+            )
+        return make_result(
+            success=(returncode == 0),
+            code=returncode,
+            data=data,
+            notes=notes,
+            meta=meta,
+        )
+
+    def _call_persistent(self, input_payload: Optional[Any]) -> Any:
+        """Send the payload to this command's persistent worker; see _Worker."""
+        cfg = self.configuration or {}
+        cmd = cfg.get("command")
+        if cmd is None:
+            raise KeyError("process connector requires 'command' in configuration")
+        cmd_key = _split_cmd(cmd) if isinstance(cmd, str) else tuple(cmd)
+        payload = b"" if input_payload is None else str(input_payload).encode("utf-8")
+
+        start_ts = _time.monotonic()
+        log_cmd = None
+        if logger.isEnabledFor(logging.INFO):
+            log_cmd = self._sanitize_for_logging(list(cmd_key), cfg)
+            logger.info("ProcessProvider sending to persistent command: %s", log_cmd)
+        worker = None
+        try:
+            worker = _get_worker(cmd_key)
+            with worker.lock:
+                stdout = worker.request(payload, cfg.get("timeout"))
+        except subprocess.TimeoutExpired as e:
+            if worker is not None:
+                _discard_worker(cmd_key, worker)
+            return self._timeout_result(e)
+        except Exception as e:
+            if worker is not None:
+                _discard_worker(cmd_key, worker)
+            return result_from_exception(e)
+
+        return self._build_result(log_cmd, 0, stdout, None, start_ts)
+
+    def call(self, input_payload: Optional[Any] = None) -> Any:
+        cfg = self.configuration or {}
+        if cfg.get("persistent"):
+            return self._call_persistent(input_payload)
+        cmd_list, input_bytes = self._build_command(input_payload)
+
         timeout = cfg.get("timeout")
-        start_ts = _time.time()
+        start_ts = _time.monotonic()
 
-        # Prepare sanitized command for logging
-        log_cmd = self._sanitize_for_logging(cmd_list, cfg)
-        logging.getLogger(__name__).info("ProcessProvider running command: %s", log_cmd)
+        # Prepare sanitized command for logging (skipped if it would be dropped)
+        log_cmd = None
+        if logger.isEnabledFor(logging.INFO):
+            log_cmd = self._sanitize_for_logging(cmd_list, cfg)
+            logger.info("ProcessProvider running command: %s", log_cmd)
         try:
             proc = subprocess.run(
                 cmd_list,
@@ -164,52 +483,56 @@ class ProcessProvider:
                 timeout=timeout,
             )
         except subprocess.TimeoutExpired as e:
-            # Return structured error result for timeouts (runtime failure)
-            return make_result(
-                success=False,
-                code=None,
-                data=None,
-                notes=["timeout"],
-                meta={"timeout": True, "exception": str(e)},
-            )
+            return self._timeout_result(e)
         except Exception as e:
             # Non-programmer runtime errors (e.g. OSError) returned as structured result
             return result_from_exception(e)
 
-        stdout = (
-            proc.stdout.decode("utf-8", errors="ignore")
-            if isinstance(proc.stdout, (bytes, bytearray))
-            else proc.stdout
-        )
-        stderr = (
-            proc.stderr.decode("utf-8", errors="ignore")
-            if isinstance(proc.stderr, (bytes, bytearray))
-            else proc.stderr
+        return self._build_result(
+            log_cmd, proc.returncode, proc.stdout, proc.stderr, start_ts
         )
 
-        # try to parse stdout as json
-        meta = {"stderr": stderr, "returncode": proc.returncode}
+    async def acall(self, input_payload: Optional[Any] = None) -> Any:
+        """Asynchronous variant of call() built on asyncio subprocesses.
+
+        Lets many process steps run concurrently from a single event loop
+        instead of blocking one thread per child process.
+        """
+        cfg = self.configuration or {}
+        if cfg.get("persistent"):
+            # requests to a worker are short and serialized per command
+            return await asyncio.to_thread(self._call_persistent, input_payload)
+        cmd_list, input_bytes = self._build_command(input_payload)
+
+        timeout = cfg.get("timeout")
+        start_ts = _time.monotonic()
+
+        log_cmd = None
+        if logger.isEnabledFor(logging.INFO):
+            log_cmd = self._sanitize_for_logging(cmd_list, cfg)
+            logger.info("ProcessProvider running command: %s", log_cmd)
         try:
-            data = json.loads(stdout)
-        except Exception:
-            data = stdout
+            proc = await asyncio.create_subprocess_exec(
+                *cmd_list,
+                stdin=asyncio.subprocess.PIPE if input_bytes is not None else None,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+            )
+        except Exception as e:
+            return result_from_exception(e)
 
-        notes = (
-            []
-            if proc.returncode == 0
-            else [f"process exited with code {proc.returncode}"]
-        )
-        elapsed = _time.time() - start_ts
-        logging.getLogger(__name__).info(
-            "ProcessProvider finished command: %s returncode=%s elapsed=%.3fs",
-            log_cmd,  # Use sanitized version
-            proc.returncode,
-            elapsed,
-        )
-        return make_result(
-            success=(proc.returncode == 0),
-            code=proc.returncode,
-            data=data,
-            notes=notes,
-            meta=meta,
-        )
+        try:
+            stdout, stderr = await asyncio.wait_for(
+                proc.communicate(input_bytes), timeout
+            )
+        except asyncio.TimeoutError:
+            # don't leave the child running once we've given up on it
+            proc.kill()
+            await proc.wait()
+            # wait_for only times out when it was given a timeout
+            assert timeout is not None
+            return self._timeout_result(subprocess.TimeoutExpired(cmd_list, timeout))
+
+        # communicate() has waited for the child, so the return code is set
+        assert proc.returncode is not None
+        return self._build_result(log_cmd, proc.returncode, stdout, stderr, start_ts)
@@ -1,12 +1,59 @@
 from __future__ import annotations
 
+import asyncio
+import threading
+from http.cookiejar import DefaultCookiePolicy
 from typing import Any, Dict, Optional
+from urllib.parse import urlsplit
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
+from ..jsonutil import loads as json_loads
 from .result import make_result, result_from_exception
 
 
+def _make_session() -> requests.Session:
+    """Build the shared session used by every RestProvider.
+
+    Reusing one session keeps connections alive between calls (and across
+    runner threads) so consecutive requests to the same host skip the
+    TCP/TLS handshake. Cookies are refused so state never leaks between
+    steps or sources, matching the old one-request-per-call behaviour.
+
+    Idempotent requests are retried twice on connection errors: a pooled
+    keep-alive connection may have been closed by the server while idle,
+    which a fresh connection per call never ran into. Responses, including
+    error statuses, are never retried.
+    """
+    session = requests.Session()
+    session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+    retry = Retry(total=2, backoff_factor=0.1, status_forcelist=None)
+    adapter = HTTPAdapter(pool_connections=32, pool_maxsize=32, max_retries=retry)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+_SESSION = _make_session()
+
+# concurrent requests allowed per host; keeps parallel steps hitting the same
+# API within the session's connection pool so connections are reused rather
+# than opened and discarded
+_MAX_PER_HOST = 8
+_HOST_SLOTS: Dict[str, threading.BoundedSemaphore] = {}
+
+
+def _host_slot(url: str) -> threading.BoundedSemaphore:
+    host = urlsplit(url).netloc
+    slot = _HOST_SLOTS.get(host)
+    if slot is None:
+        # setdefault is atomic, so racing threads end up sharing one semaphore
+        slot = _HOST_SLOTS.setdefault(host, threading.BoundedSemaphore(_MAX_PER_HOST))
+    return slot
+
+
 class RestProvider:
     type_name = "rest"
 
@@ -26,16 +73,20 @@ class RestProvider:
             json_body = input_payload
 
         try:
-            resp = requests.request(
-                method, url, params=params, json=json_body, headers=headers
-            )
+            with _host_slot(url):
+                resp = _SESSION.request(
+                    method, url, params=params, json=json_body, headers=headers
+                )
         except Exception as e:
             return result_from_exception(e)
 
         status_code = resp.status_code
+        # a plain dict: results must stay JSON-serializable and must not keep
+        # the response alive
         meta = {"status_code": status_code, "headers": dict(resp.headers)}
         try:
-            data = resp.json()
+            # parse the raw body bytes directly rather than via resp.json()
+            data = json_loads(resp.content)
         except Exception:
             data = resp.text
 
@@ -50,3 +101,11 @@ class RestProvider:
             notes=notes,
             meta=meta,
         )
+
+    async def acall(self, input_payload: Optional[Any] = None) -> Any:
+        """Asynchronous variant of call(), for fanning out with asyncio.gather.
+
+        The request runs in a worker thread, so it still goes through the
+        shared pooled session and the per-host limit.
+        """
+        return await asyncio.to_thread(self.call, input_payload)
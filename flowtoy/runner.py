@@ -1,31 +1,71 @@
 from __future__ import annotations
 
 import logging
-import re
+import multiprocessing
+import os
 import threading
 import time
-from concurrent.futures import (
-    FIRST_COMPLETED,
-    Future,
-    ThreadPoolExecutor,
-)
-from concurrent.futures import (
-    wait as cf_wait,
-)
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
 from queue import Queue
-from typing import Any, Dict, Optional
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
 
 from .config import get_flow_steps, get_sources
 from .providers import create_provider
-from .templating import extract_jmespath, render_dict_templates, render_template
+from .templating import (
+    compile_dict_templates,
+    compile_template,
+    extract_jmespath,
+    render_dict_templates,
+    render_template,
+)
+
+try:
+    # C implementation, cheaper for the short uncontended sections below
+    # (installed with the 'fast' extra)
+    from fastrlock.rlock import FastRLock as _RLock  # type: ignore[import-untyped]
+except ImportError:  # pragma: no cover - exercised when fastrlock is absent
+    from threading import RLock as _RLock
+
+logger = logging.getLogger(__name__)
+
+# characters of a step name in a ``flows.<step>.`` reference
+_STEP_NAME_CHARS = frozenset(
+    "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789_"
+)
+
+
+def _iter_step_refs(text: str) -> Iterator[str]:
+    """Yield the step names referenced as ``flows.<step>.`` in ``text``.
+
+    Equivalent to scanning with the regex ``flows[.]([A-Za-z0-9_]+)[.]`` but
+    driven by ``str.find``, which skips over long template bodies faster.
+    """
+    find = text.find
+    n = len(text)
+    i = find("flows.")
+    while i >= 0:
+        start = j = i + 6
+        while j < n and text[j] in _STEP_NAME_CHARS:
+            j += 1
+        if j > start and j < n and text[j] == ".":
+            yield text[start:j]
+            i = find("flows.", j + 1)
+        else:
+            i = find("flows.", i + 1)
 
 
 class StepStatus:
+    __slots__ = ("name", "state", "started_at", "ended_at", "error", "outputs")
+
     name: str
     state: str
     started_at: Optional[float]
     ended_at: Optional[float]
     error: Optional[str]
+    # names of the outputs the step has published, recorded alongside flows so
+    # status readers don't have to look into the outputs themselves
+    outputs: Tuple[str, ...]
 
     def __init__(self, name: str):
         self.name = name
@@ -33,19 +73,59 @@ class StepStatus:
         self.started_at = None
         self.ended_at = None
         self.error = None
+        self.outputs = ()
+
+
+def _call_provider(src_type: str, cfg: Dict[str, Any], payload: Any) -> Any:
+    """Create a provider and call it; the entry point for provider processes."""
+    return create_provider(src_type, cfg).call(payload)
+
+
+# (name_to_step, deps, dependents, input_renderers, config_renderers); see
+# LocalRunner._build_graph
+_Graph = Tuple[
+    Dict[str, Dict[str, Any]],
+    Dict[str, set],
+    Dict[str, Tuple[str, ...]],
+    Dict[str, Callable[[Dict[str, Any]], str]],
+    Dict[str, Callable[[Dict[str, Any]], Any]],
+]
+
+# step states that count towards RunStatus.completed
+_DONE_STATES = frozenset(("succeeded", "failed"))
 
 
 class RunStatus:
+    __slots__ = (
+        "steps",
+        "started_at",
+        "ended_at",
+        "run_id",
+        "version",
+        "completed",
+        "running",
+    )
+
     steps: Dict[str, StepStatus]
     started_at: Optional[float]
     ended_at: Optional[float]
     run_id: int
+    # bumped (under the runner lock) on every status or output change, so API
+    # clients can tell whether anything changed since their last poll
+    version: int
+    # maintained on each state transition so status readers don't rescan steps:
+    # number of succeeded/failed steps, and running steps in start order
+    completed: int
+    running: Dict[str, None]
 
     def __init__(self):
         self.steps = {}
         self.started_at = None
         self.ended_at = None
         self.run_id = int(time.time() * 1000)
+        self.version = 0
+        self.completed = 0
+        self.running = {}
 
 
 class LocalRunner:
@@ -55,14 +135,46 @@ class LocalRunner:
         self.steps = get_flow_steps(config)
         self.flows: Dict[str, Dict[str, Any]] = {}
         self.status = RunStatus()
-        # lock to protect self.flows and status updates when running concurrently
-        self._lock = threading.RLock()
+        # dependency graph, built lazily on the first run() (see _build_graph)
+        self._graph: Optional[_Graph] = None
+        # lock serialising writers of self.flows and status updates when running
+        # concurrently; readers of self.flows just take the current reference
+        self._lock = _RLock()
+        # notified on every status.version bump; status long-polls wait on it
+        self._changed = threading.Condition(self._lock)
         # configurable max workers
         self._max_workers = (
             (config.get("runner") or {}).get("max_workers")
             if isinstance((config.get("runner") or {}).get("max_workers"), int)
             else None
         )
+        # optional process pool size for provider calls (runner.provider_processes)
+        procs = (config.get("runner") or {}).get("provider_processes")
+        self._provider_processes = procs if isinstance(procs, int) else None
+        # set by request_stop(); the scheduler stops submitting new steps
+        self._stop = threading.Event()
+
+    def _bump_version(self) -> None:
+        # caller holds self._lock
+        self.status.version += 1
+        self._changed.notify_all()
+
+    def wait_for_change(self, since: int, timeout: Optional[float] = None) -> bool:
+        """Block until ``status.version`` is greater than ``since``.
+
+        Returns:
+            ``True`` if the status changed, ``False`` if ``timeout`` expired.
+        """
+        with self._changed:
+            return self._changed.wait_for(lambda: self.status.version > since, timeout)
+
+    def request_stop(self) -> None:
+        """Ask a running ``run()`` to stop scheduling new steps.
+
+        Steps already in flight finish and publish their outputs; ``run()``
+        then returns. Pending steps are left in the ``pending`` state.
+        """
+        self._stop.set()
 
     def _update_step_status(
         self, step_name: str, state: Optional[str] = None, **kwargs
@@ -77,26 +189,80 @@ class LocalRunner:
         with self._lock:
             st = self.status.steps.get(step_name)
             if st:
-                if state is not None:
+                if state is not None and state != st.state:
+                    status = self.status
+                    if st.state == "running":
+                        status.running.pop(step_name, None)
+                    elif state == "running":
+                        status.running[step_name] = None
+                    status.completed += (state in _DONE_STATES) - (
+                        st.state in _DONE_STATES
+                    )
                     st.state = state
                 for k, v in kwargs.items():
                     setattr(st, k, v)
+                self._bump_version()
 
-    def run(self):
-        # Set run start timestamp atomically
-        with self._lock:
-            self.status.started_at = time.time()
+    def _skip_descendants(
+        self,
+        root: str,
+        dependents: Dict[str, Tuple[str, ...]],
+        in_degree: Dict[str, int],
+    ) -> None:
+        """Mark every not-yet-skipped step downstream of ``root`` as skipped.
 
-        logging.getLogger(__name__).info("runner starting: %d steps", len(self.steps))
-        try:
-            step_names = [s.get("name") for s in self.steps]
-        except Exception:
-            step_names = None
-        logging.getLogger(__name__).info("steps: %s", step_names)
-        logging.getLogger(__name__).info(
-            "runner starting: %d steps -> %s", len(self.steps), step_names
-        )
+        Walks the graph breadth-first so deep chains cannot hit the recursion
+        limit. Skipped steps get an in-degree of -1 so they are never scheduled.
+        """
+        queue = deque([root])
+        while queue:
+            n = queue.popleft()
+            for dep in dependents.get(n, ()):
+                if in_degree.get(dep, 0) >= 0:
+                    in_degree[dep] = -1
+                    self._update_step_status(
+                        dep, state="skipped", started_at=None, ended_at=time.time()
+                    )
+                    queue.append(dep)
+
+    def _resolve_source(self, step: Dict[str, Any]) -> Tuple[str, Dict[str, Any]]:
+        """Return the provider type and (unrendered) configuration for a step.
 
+        Raises:
+            RuntimeError: If the step's source has no valid type.
+        """
+        src = step.get("source")
+        if isinstance(src, dict) and "base" in src:
+            base = self.sources.get(src["base"]) or {}
+            override = src.get("override") or {}
+            source_def = {**base, **override}
+        elif isinstance(src, str):
+            source_def = self.sources.get(src) or {"type": src}
+        else:
+            source_def = src or {}
+
+        src_type = source_def.get("type")
+        if not isinstance(src_type, str):
+            raise RuntimeError("invalid source type")
+        cfg = source_def.get("configuration") or {}
+        if not isinstance(cfg, dict):
+            cfg = {}
+        return src_type, cfg
+
+    def _build_graph(self) -> _Graph:
+        """Build the step dependency graph from the flow definition.
+
+        The graph only depends on ``self.steps``, so it is built once and reused
+        by every ``run()``. Input and source configuration templates are
+        compiled here as well, so steps only render them.
+
+        Returns:
+            ``(name_to_step, deps, dependents, input_renderers,
+            config_renderers)``
+
+        Raises:
+            ValueError: If a step depends on a step that does not exist.
+        """
         # Build name->step map and initial structures
         name_to_step: Dict[str, Dict[str, Any]] = {}
         for s in self.steps:
@@ -106,9 +272,8 @@ class LocalRunner:
 
         # infer dependencies: explicit depends_on or references to
         # flows.<step> in input templates
-        dep_re = re.compile(r"flows\.([A-Za-z0-9_]+)\.")
         deps: Dict[str, set] = {name: set() for name in name_to_step}
-        dependents: Dict[str, set] = {name: set() for name in name_to_step}
+        dependents_lists: Dict[str, list] = {name: [] for name in name_to_step}
 
         for name, step in name_to_step.items():
             # explicit depends_on
@@ -123,8 +288,7 @@ class LocalRunner:
             for key in ("value", "template"):
                 val = input_def.get(key)
                 if isinstance(val, str):
-                    for m in dep_re.finditer(val):
-                        deps[name].add(m.group(1))
+                    deps[name].update(_iter_step_refs(val))
 
         # normalize and validate deps
         invalid_deps: Dict[str, set] = {}
@@ -137,7 +301,12 @@ class LocalRunner:
             # Keep only valid dependencies
             deps[name] = {d for d in deps[name] if d in name_to_step}
             for d in deps[name]:
-                dependents[d].add(name)
+                dependents_lists[d].append(name)
+
+        # frozen to tuples: the scheduler walks them after every completion,
+        # and they come out in flow definition order since deps is walked in
+        # that order
+        dependents = {name: tuple(ds) for name, ds in dependents_lists.items()}
 
         # Validate: raise error if any step references non-existent dependencies
         if invalid_deps:
@@ -152,276 +321,334 @@ class LocalRunner:
                 + "\n".join(error_lines)
             )
 
-        # compute in-degree
+        # compiled input templates by step; a template that fails to compile
+        # is left out and rendered (and reported) when its step runs
+        input_renderers: Dict[str, Callable[[Dict[str, Any]], str]] = {}
+        for name, step in name_to_step.items():
+            input_def = step.get("input") or {}
+            itype = input_def.get("type")
+            if itype == "parameter":
+                src = str(input_def.get("value"))
+            elif itype in ("filter", "body"):
+                src = str(input_def.get("template") or "")
+            else:
+                continue
+            try:
+                input_renderers[name] = compile_template(src)
+            except Exception:
+                pass
+
+        # compiled source configuration by step; as above, anything that fails
+        # here is resolved and rendered by the step itself
+        config_renderers: Dict[str, Callable[[Dict[str, Any]], Any]] = {}
+        for name, step in name_to_step.items():
+            try:
+                config_renderers[name] = compile_dict_templates(
+                    self._resolve_source(step)[1]
+                )
+            except Exception:
+                pass
+
+        return name_to_step, deps, dependents, input_renderers, config_renderers
+
+    def _run_step(
+        self,
+        step_name: str,
+        default_on_error: str,
+        provider_pool: Optional[ProcessPoolExecutor],
+        sources_context: Dict[str, Any],
+    ) -> Tuple[bool, Optional[Exception], Optional[str]]:
+        """Execute one step on an executor thread and publish its outputs.
+
+        Returns:
+            ``(ok, exception, on_error_policy)``; the last two are None on
+            success.
+        """
+        # run() builds the graph before any step is scheduled
+        assert self._graph is not None
+        name_to_step, _, _, input_renderers, config_renderers = self._graph
+        logger.info("starting step: %s", step_name)
+        self._update_step_status(step_name, state="running", started_at=time.time())
+        step = name_to_step[step_name]
+        try:
+            src_type, cfg = self._resolve_source(step)
+
+            # Render templates in configuration with current snapshot.
+            # self.flows is replaced (never mutated) on every write, so
+            # holding the reference is a consistent snapshot without a
+            # copy; self.sources is never modified after __init__
+            flows_snapshot = self.flows
+
+            template_context = {
+                "flows": flows_snapshot,
+                "sources": sources_context,
+            }
+            render_cfg = config_renderers.get(step_name)
+            if render_cfg is not None:
+                rendered_cfg = render_cfg(template_context)
+            else:
+                rendered_cfg = render_dict_templates(cfg, template_context)
+
+            provider = (
+                create_provider(src_type, rendered_cfg)
+                if provider_pool is None
+                else None
+            )
+
+            # build input payload with current snapshot of flows and sources;
+            # re-read the published outputs, no copy needed (see above)
+            input_def = step.get("input") or {}
+            payload = None
+            itype = input_def.get("type")
+            input_context = {"flows": self.flows, "sources": self.sources}
+            render_input = input_renderers.get(step_name)
+
+            if render_input is not None:
+                payload = render_input(input_context)
+            elif itype == "parameter":
+                payload = render_template(str(input_def.get("value")), input_context)
+            elif itype in ("filter", "body"):
+                payload = render_template(
+                    str(input_def.get("template") or ""), input_context
+                )
+
+            if provider is not None:
+                result = provider.call(payload)
+            else:
+                assert provider_pool is not None
+                result = provider_pool.submit(
+                    _call_provider, src_type, rendered_cfg, payload
+                ).result()
+
+            # unify result
+            if isinstance(result, dict) and "status" in result:
+                status_obj = result.get("status") or {}
+                success = status_obj.get("success", True)
+                code = status_obj.get("code")
+                notes = status_obj.get("notes") or []
+                error_msg = "; ".join(notes) if notes else None
+                data = result.get("data")
+            else:
+                success = True
+                code = None
+                error_msg = None
+                data = result
+
+            if not success:
+                raise RuntimeError(
+                    error_msg or f"provider reported failure (code={code})"
+                )
+
+            # extract outputs
+            outputs = step.get("output") or []
+            out_map: Dict[str, Any] = {}
+            for out in outputs:
+                oname = out.get("name")
+                if not isinstance(oname, str):
+                    continue
+                otype = out.get("type")
+                if otype == "jmespath":
+                    expr = out.get("value")
+                    val = extract_jmespath(str(expr or ""), data)
+                elif otype == "json":
+                    val = data
+                else:
+                    val = data
+                out_map[oname] = val
+
+            # publish a new mapping instead of mutating the current one
+            # so snapshots already handed out stay unchanged
+            with self._lock:
+                self.flows = {**self.flows, step_name: out_map}
+                st = self.status.steps.get(step_name)
+                if st is not None:
+                    st.outputs = tuple(out_map)
+                self._bump_version()
+            self._update_step_status(step_name, state="succeeded", ended_at=time.time())
+            logger.info("step succeeded: %s", step_name)
+            return True, None, None
+        except Exception as e:
+            self._update_step_status(
+                step_name, state="failed", error=str(e), ended_at=time.time()
+            )
+            logger.exception("step failed: %s", step_name)
+            # determine per-step policy
+            policy = (step.get("on_error") or default_on_error or "fail").lower()
+            return False, e, policy
+
+    def _sources_context(self) -> Dict[str, Any]:
+        """Build the ``sources`` seen by config templates for one run.
+
+        Env sources expose their variables, read from a single copy of the
+        environment taken at the start of the run; other sources expose
+        their raw definition.
+        """
+        environ = dict(os.environ)
+        sources_context: Dict[str, Any] = {}
+        for src_name, src_def in self.sources.items():
+            if isinstance(src_def, dict) and src_def.get("type") == "env":
+                env_cfg = src_def.get("configuration") or {}
+                vars_list = env_cfg.get("vars") or []
+                sources_context[src_name] = {var: environ.get(var) for var in vars_list}
+            else:
+                sources_context[src_name] = src_def
+        return sources_context
+
+    def run(self):
+        # Set run start timestamp atomically
+        with self._lock:
+            self.status.started_at = time.time()
+            self._bump_version()
+
+        # the step name list is only built when it will actually be logged
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("runner starting: %d steps", len(self.steps))
+            try:
+                step_names = [s.get("name") for s in self.steps]
+            except Exception:
+                step_names = None
+            logger.info("steps: %s", step_names)
+            logger.info("runner starting: %d steps -> %s", len(self.steps), step_names)
+
+        if self._graph is None:
+            self._graph = self._build_graph()
+        name_to_step, deps, dependents, _, _ = self._graph
+
+        # compute in-degree (mutated by the scheduler, so fresh per run)
         in_degree: Dict[str, int] = {name: len(deps[name]) for name in name_to_step}
 
-        # prepare status entries
+        # prepare status entries; the dict is built before anyone can see it
+        # and published with a single assignment
+        steps = {name: StepStatus(name) for name in name_to_step}
         with self._lock:
-            for name in name_to_step:
-                self.status.steps[name] = StepStatus(name)
+            self.status.steps = steps
+            self.status.completed = 0
+            self.status.running = {}
+            self._bump_version()
 
         # default on_error policy (per-flow default)
         runner_conf = self.config.get("runner") or {}
         default_on_error = (runner_conf.get("on_error") or "fail").lower()
+        sources_context = self._sources_context()
 
         # executor
         max_workers = self._max_workers or min(4, (threading.active_count() or 1) + 3)
         executor = ThreadPoolExecutor(max_workers=max_workers)
+        # provider calls run in child processes when configured, so CPU-heavy
+        # result handling does not compete for the GIL with the API server;
+        # spawned rather than forked, since forking while executor and server
+        # threads hold locks can deadlock the children
+        provider_pool = (
+            ProcessPoolExecutor(
+                max_workers=self._provider_processes,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+            if self._provider_processes
+            else None
+        )
         futures: Dict[Future, str] = {}
-        ready_q = Queue()
+        # steps whose dependencies are satisfied; only the scheduler thread
+        # touches it, so a plain deque is enough (no Queue mutex per step)
+        ready: deque = deque()
+        done_q: "Queue[Future]" = Queue()
 
         # enqueue initial ready steps
         for name, deg in in_degree.items():
             if deg == 0:
-                ready_q.put(name)
+                ready.append(name)
 
         error_occurred = threading.Event()
 
-        def submit_step(step_name: str):
-            def task():
-                logging.getLogger(__name__).info("starting step: %s", step_name)
-                self._update_step_status(
-                    step_name, state="running", started_at=time.time()
-                )
-                step = name_to_step[step_name]
-                try:
-                    # resolve source
-                    src = step.get("source")
-                    if isinstance(src, dict) and "base" in src:
-                        base = self.sources.get(src["base"]) or {}
-                        override = src.get("override") or {}
-                        source_def = {**base, **override}
-                    elif isinstance(src, str):
-                        source_def = self.sources.get(src) or {"type": src}
-                    else:
-                        source_def = src or {}
-
-                    src_type = source_def.get("type")
-                    if not isinstance(src_type, str):
-                        raise RuntimeError("invalid source type")
-                    cfg = source_def.get("configuration") or {}
-                    if not isinstance(cfg, dict):
-                        cfg = {}
-
-                    # Render templates in configuration with current snapshot
-                    # Build template context including env sources
-                    with self._lock:
-                        flows_snapshot = dict(self.flows)
-
-                        # Build sources context with env provider data
-                        sources_context = {}
-                        for src_name, src_def in self.sources.items():
-                            if (
-                                isinstance(src_def, dict)
-                                and src_def.get("type") == "env"
-                            ):
-                                # For env sources, read env vars directly
-                                import os
-
-                                env_cfg = src_def.get("configuration") or {}
-                                vars_list = env_cfg.get("vars") or []
-                                env_data = {
-                                    var: os.environ.get(var) for var in vars_list
-                                }
-                                sources_context[src_name] = env_data
-                            else:
-                                # For other sources, include the raw definition
-                                sources_context[src_name] = src_def
-
-                    template_context = {
-                        "flows": flows_snapshot,
-                        "sources": sources_context,
-                    }
-                    rendered_cfg = render_dict_templates(cfg, template_context)
-
-                    provider = create_provider(src_type, rendered_cfg)
-
-                    # build input payload with current snapshot of flows and sources
-                    input_def = step.get("input") or {}
-                    payload = None
-                    itype = input_def.get("type")
-                    # render templates under lock to get consistent snapshot
-                    with self._lock:
-                        flows_snapshot = dict(self.flows)
-                        sources_snapshot = dict(self.sources)
-
-                    if itype == "parameter":
-                        val = input_def.get("value")
-                        payload = render_template(
-                            str(val),
-                            {"flows": flows_snapshot, "sources": sources_snapshot},
-                        )
-                    elif itype in ("filter", "body"):
-                        template = input_def.get("template")
-                        payload = render_template(
-                            str(template or ""),
-                            {"flows": flows_snapshot, "sources": sources_snapshot},
-                        )
-
-                    result = provider.call(payload)
-
-                    # unify result
-                    if isinstance(result, dict) and "status" in result:
-                        status_obj = result.get("status") or {}
-                        success = status_obj.get("success", True)
-                        code = status_obj.get("code")
-                        notes = status_obj.get("notes") or []
-                        error_msg = "; ".join(notes) if notes else None
-                        data = result.get("data")
-                    else:
-                        success = True
-                        code = None
-                        error_msg = None
-                        data = result
-
-                    if not success:
-                        raise RuntimeError(
-                            error_msg
-                            or ("provider reported failure (code=" + str(code) + ")")
-                        )
-
-                    # extract outputs
-                    outputs = step.get("output") or []
-                    out_map: Dict[str, Any] = {}
-                    for out in outputs:
-                        oname = out.get("name")
-                        if not isinstance(oname, str):
-                            continue
-                        otype = out.get("type")
-                        if otype == "jmespath":
-                            expr = out.get("value")
-                            val = extract_jmespath(str(expr or ""), data)
-                        elif otype == "json":
-                            val = data
-                        else:
-                            val = data
-                        out_map[oname] = val
-
-                    with self._lock:
-                        self.flows[step_name] = out_map
-                    self._update_step_status(
-                        step_name, state="succeeded", ended_at=time.time()
-                    )
-                    logging.getLogger(__name__).info("step succeeded: %s", step_name)
-                    return True, None, None
-                except Exception as e:
-                    self._update_step_status(
-                        step_name, state="failed", error=str(e), ended_at=time.time()
-                    )
-                    logging.getLogger(__name__).exception("step failed: %s", step_name)
-                    # determine per-step policy
-                    policy = (
-                        step.get("on_error") or default_on_error or "fail"
-                    ).lower()
-                    return False, e, policy
-
-            return executor.submit(task)
+        def submit(step_name: str) -> None:
+            fut = executor.submit(
+                self._run_step,
+                step_name,
+                default_on_error,
+                provider_pool,
+                sources_context,
+            )
+            fut.add_done_callback(done_q.put)
+            futures[fut] = step_name
 
         # main scheduler loop
         try:
             # seed initial submissions
-            while not ready_q.empty():
-                n = ready_q.get()
-                f = submit_step(n)
-                futures[f] = n
+            while ready:
+                submit(ready.popleft())
 
             # process completions and submit dependents
             while futures:
-                # wait for any future to complete (or timeout)
-                done, _ = cf_wait(
-                    list(futures.keys()), timeout=0.1, return_when=FIRST_COMPLETED
-                )
-                to_process = (
-                    list(done)
-                    if done
-                    else [f for f in list(futures.keys()) if f.done()]
-                )
-                if not to_process:
-                    # small sleep to avoid busy loop
-                    time.sleep(0.05)
-                    continue
-
-                for f in to_process:
-                    step_name = futures.pop(f)
-                    try:
-                        ok, exc, policy = f.result()
-                    except Exception:
-                        # If the task itself raised unexpectedly, treat as
-                        # failure with default policy
-                        ok = False
-
-                    if not ok:
-                        # handle each dependent according to the dependent's
-                        # own on_error
-                        def skip_descendants(n):
-                            for dep in list(dependents.get(n, [])):
-                                if in_degree.get(dep, 0) >= 0:
-                                    in_degree[dep] = -1
-                                    self._update_step_status(
-                                        dep,
-                                        state="skipped",
-                                        started_at=None,
-                                        ended_at=time.time(),
-                                    )
-                                    skip_descendants(dep)
-
-                        for dep in dependents.get(step_name, set()):
-                            dep_step = name_to_step.get(dep) or {}
-                            dep_policy = (
-                                dep_step.get("on_error") or default_on_error or "fail"
-                            ).lower()
-                            if dep_policy == "skip":
-                                # mark this dependent itself skipped
-                                self._update_step_status(
-                                    dep,
-                                    state="skipped",
-                                    started_at=None,
-                                    ended_at=time.time(),
-                                )
-                                # mark descendants skipped as well
-                                skip_descendants(dep)
-                                in_degree[dep] = -1
-                            elif dep_policy == "continue":
-                                # allow dependent to be scheduled; we'll decrement
-                                # its in_degree below
-                                pass
-                            elif dep_policy == "fail":
-                                # dependent requires fail-on-missing-dependency ->
-                                # stop whole run
-                                error_occurred.set()
-                                with ready_q.mutex:
-                                    ready_q.queue.clear()
-                                futures.clear()
-                                break
-                            else:
-                                # unknown policy: treat as fail-fast for safety
-                                error_occurred.set()
-                                with ready_q.mutex:
-                                    ready_q.queue.clear()
-                                futures.clear()
-                                break
-
-                    # on success or handled dependents above, decrement
-                    # in_degree for dependents and enqueue if ready
-                    for dep in dependents.get(step_name, set()):
-                        # only decrement if not already marked skipped
-                        if in_degree.get(dep, 0) > 0:
-                            in_degree[dep] -= 1
-                            if in_degree[dep] == 0:
-                                ready_q.put(dep)
+                # block until a task finishes; each task reports itself on
+                # done_q from its done-callback, so there is no polling
+                f = done_q.get()
+                step_name = futures.pop(f)
+                try:
+                    ok, exc, policy = f.result()
+                except Exception:
+                    # If the task itself raised unexpectedly, treat as
+                    # failure with default policy
+                    ok = False
+
+                if not ok:
+                    # handle each dependent according to the dependent's
+                    # own on_error
+                    for dep in dependents[step_name]:
+                        dep_step = name_to_step.get(dep) or {}
+                        dep_policy = (
+                            dep_step.get("on_error") or default_on_error or "fail"
+                        ).lower()
+                        if dep_policy == "skip":
+                            # mark this dependent itself skipped
+                            self._update_step_status(
+                                dep,
+                                state="skipped",
+                                started_at=None,
+                                ended_at=time.time(),
+                            )
+                            # mark descendants skipped as well
+                            self._skip_descendants(dep, dependents, in_degree)
+                            in_degree[dep] = -1
+                        elif dep_policy == "continue":
+                            # allow dependent to be scheduled; we'll decrement
+                            # its in_degree below
+                            pass
+                        elif dep_policy == "fail":
+                            # dependent requires fail-on-missing-dependency ->
+                            # stop whole run
+                            error_occurred.set()
+                            ready.clear()
+                            futures.clear()
+                            break
+                        else:
+                            # unknown policy: treat as fail-fast for safety
+                            error_occurred.set()
+                            ready.clear()
+                            futures.clear()
+                            break
+
+                # on success or handled dependents above, decrement
+                # in_degree for dependents and enqueue if ready
+                for dep in dependents[step_name]:
+                    # only decrement if not already marked skipped
+                    if in_degree.get(dep, 0) > 0:
+                        in_degree[dep] -= 1
+                        if in_degree[dep] == 0:
+                            ready.append(dep)
 
                 # submit any newly ready (unless an error stopped us)
-                while not ready_q.empty() and not error_occurred.is_set():
-                    n = ready_q.get()
-                    f2 = submit_step(n)
-                    futures[f2] = n
+                while ready and not error_occurred.is_set() and not self._stop.is_set():
+                    submit(ready.popleft())
 
                 if error_occurred.is_set():
                     break
 
         finally:
             executor.shutdown(wait=False)
+            self._stop.clear()
+            if provider_pool is not None:
+                provider_pool.shutdown(wait=False, cancel_futures=True)
 
         # Set run end timestamp atomically
         with self._lock:
             self.status.ended_at = time.time()
+            self._bump_version()
@@ -2,13 +2,25 @@ from __future__ import annotations
 
 import logging
 import threading
+import time
 from collections import deque
-from typing import Any, Optional
+from typing import Any, List, Optional, Tuple
 
 import uvicorn
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.responses import JSONResponse
 
+from .api import (
+    StatusCache,
+    build_snapshot,
+    build_status,
+    shutdown_event,
+    stream_outputs,
+    threadpool_lifespan,
+    wait_for_version,
+)
+from .jsonutil import response_class
+
 
 class LogCapture(logging.Handler):
     """Logging handler that captures log records in a deque."""
@@ -16,90 +28,126 @@ class LogCapture(logging.Handler):
     def __init__(self, maxlen: int = 100):
         super().__init__()
         self.records = deque(maxlen=maxlen)
+        # number of records captured so far, including ones dropped from
+        # ``records``; see records_since
+        self.total = 0
 
     def emit(self, record: logging.LogRecord):
         try:
             msg = self.format(record)
             self.records.append(msg)
+            self.total += 1
         except Exception:
             self.handleError(record)
 
+    def records_since(self, seen: int) -> Tuple[int, List[str]]:
+        """Return ``(total, new_records)`` for a reader that has seen ``seen``.
+
+        Only records still held in ``records`` can be returned, so a reader
+        that falls far behind gets the most recent ``maxlen`` of them.
+        """
+        # emit runs under the handler lock, so total and records agree here;
+        # Handler.__init__ always creates it
+        assert self.lock is not None
+        with self.lock:
+            new = self.total - seen
+            if new <= 0:
+                return self.total, []
+            records = self.records
+            return self.total, [records[i] for i in range(-min(new, len(records)), 0)]
+
 
 def create_app_for_runner(runner: Any) -> FastAPI:
-    app = FastAPI()
+    app = FastAPI(default_response_class=response_class(), lifespan=threadpool_lifespan)
+
+    status_cache = StatusCache()
+    snapshot_cache = StatusCache()
 
     @app.get("/status")
-    def status():
+    def status(request: Request, since: Optional[int] = None):
         # delegate to the runner's status snapshot
         try:
             r = runner
             if r is None:
                 return JSONResponse({"status": "no-runner"})
+            wait_for_version(r, since)
+            return status_cache.respond(r, request, build_status)
+        except Exception as e:
+            return JSONResponse({"error": str(e)}, status_code=500)
 
-            steps_info = {}
-            for k, v in r.status.steps.items():
-                outputs = []
-                try:
-                    outputs = (
-                        list(r.flows.get(k, {}).keys())
-                        if getattr(r, "flows", None) is not None
-                        else []
-                    )
-                except Exception:
-                    outputs = []
-                steps_info[k] = {
-                    "state": v.state,
-                    "started_at": v.started_at,
-                    "ended_at": v.ended_at,
-                    "notes": ([v.error] if v.error else []),
-                    "outputs": outputs,
-                }
-
-            current_step = None
-            for name, info in steps_info.items():
-                if info.get("state") == "running":
-                    current_step = name
-                    break
-
-            total = len(steps_info)
-            completed = sum(
-                1
-                for s in steps_info.values()
-                if s.get("state") in ("succeeded", "failed")
-            )
-
-            return {
-                "run_id": r.status.run_id,
-                "started_at": r.status.started_at,
-                "ended_at": r.status.ended_at,
-                "total_steps": total,
-                "completed_steps": completed,
-                "current_step": current_step,
-                "steps": steps_info,
-            }
+    @app.get("/snapshot")
+    def snapshot(request: Request, since: Optional[int] = None):
+        # /status and /outputs in one round trip, for pollers that want both
+        try:
+            r = runner
+            if r is None:
+                return JSONResponse({"status": {"status": "no-runner"}, "outputs": {}})
+            wait_for_version(r, since)
+            return snapshot_cache.respond(r, request, build_snapshot)
         except Exception as e:
             return JSONResponse({"error": str(e)}, status_code=500)
 
+    @app.get("/outputs/stream")
+    def outputs_stream(request: Request):
+        # outputs as server-sent events, one event per change; see output_events
+        return stream_outputs(runner, request)
+
     @app.get("/outputs")
     def outputs():
         try:
             r = runner
             if r is None:
                 return {}
-            return dict(r.flows)
+            # published copy-on-write by the runner; safe to serialize directly
+            return r.flows
         except Exception as e:
             return JSONResponse({"error": str(e)}, status_code=500)
 
     return app
 
 
+class StreamAwareServer(uvicorn.Server):
+    """uvicorn server that ends open ``/outputs/stream`` responses on shutdown.
+
+    uvicorn waits for in-flight responses before exiting; an event stream
+    never finishes on its own, so the app's shutdown event is set first (see
+    ``api.shutdown_event``) and cleared again when the server starts.
+    """
+
+    async def startup(self, sockets: Optional[List[Any]] = None) -> None:
+        shutdown_event(self.config.app).clear()
+        await super().startup(sockets=sockets)
+
+    async def shutdown(self, sockets: Optional[List[Any]] = None) -> None:
+        shutdown_event(self.config.app).set()
+        await super().shutdown(sockets=sockets)
+
+
+def runner_api_server(
+    runner: Any, host: str = "127.0.0.1", port: int = 8000, log_level: str = "info"
+) -> uvicorn.Server:
+    """Build (without starting) a uvicorn server for ``runner``'s status API.
+
+    Setting ``should_exit`` on the returned server stops it, even from
+    another thread.
+    """
+    config = uvicorn.Config(
+        create_app_for_runner(runner),
+        host=host,
+        port=port,
+        log_level=log_level,
+        access_log=False,
+    )
+    return StreamAwareServer(config)
+
+
 def serve_runner_api_in_thread(
     runner: Any,
     host: str = "127.0.0.1",
     port: int = 0,
     log_level: str = "info",
     log_capture: Optional[LogCapture] = None,
-) -> threading.Thread:
+) -> int:
     """Start a uvicorn server for the given runner in a daemon thread.
 
     Args:
@@ -111,35 +159,55 @@ def serve_runner_api_in_thread(
         log_capture: Optional LogCapture handler to capture uvicorn logs
           (useful for TUI display)
 
-    Returns the Thread object. If port==0 uvicorn will pick a free port but
-    we cannot easily retrieve it here; prefer specifying a port.
+    Returns the port the server is listening on, so ``port=0`` can be used to
+    let the OS pick a free one. Blocks until the server has started.
+
+    Raises:
+        RuntimeError: If the server could not start (e.g. the port is in use).
     """
     app = create_app_for_runner(runner)
 
-    def _serve():
-        # If log capture is provided, configure uvicorn logging to use it
-        if log_capture:
-            # Configure uvicorn's loggers to use our capture handler
-            uvicorn_logger = logging.getLogger("uvicorn")
-            uvicorn_access_logger = logging.getLogger("uvicorn.access")
-
-            # Set level and add handler
-            uvicorn_logger.setLevel(getattr(logging, log_level.upper()))
-            uvicorn_access_logger.setLevel(getattr(logging, log_level.upper()))
-
-            # Remove existing handlers to avoid duplication
-            uvicorn_logger.handlers.clear()
-            uvicorn_access_logger.handlers.clear()
-
-            # Add our capture handler
-            uvicorn_logger.addHandler(log_capture)
-            uvicorn_access_logger.addHandler(log_capture)
-
-            # Run with log_config=None to use our configured loggers
-            uvicorn.run(app, host=host, port=port, log_level=log_level, log_config=None)
-        else:
-            uvicorn.run(app, host=host, port=port, log_level=log_level)
-
-    t = threading.Thread(target=_serve, daemon=True)
+    # If log capture is provided, configure uvicorn logging to use it
+    if log_capture:
+        # Configure uvicorn's loggers to use our capture handler
+        uvicorn_logger = logging.getLogger("uvicorn")
+        uvicorn_access_logger = logging.getLogger("uvicorn.access")
+
+        # Set level and add handler
+        uvicorn_logger.setLevel(getattr(logging, log_level.upper()))
+        uvicorn_access_logger.setLevel(getattr(logging, log_level.upper()))
+
+        # Remove existing handlers to avoid duplication
+        uvicorn_logger.handlers.clear()
+        uvicorn_access_logger.handlers.clear()
+
+        # Add our capture handler
+        uvicorn_logger.addHandler(log_capture)
+        uvicorn_access_logger.addHandler(log_capture)
+
+        # captured records must not also reach root handlers (e.g. the CLI's
+        # stderr handler, which would draw over the TUI), and access records
+        # must not be captured a second time through the "uvicorn" logger
+        uvicorn_logger.propagate = False
+        uvicorn_access_logger.propagate = False
+
+        # Run with log_config=None to use our configured loggers
+        config = uvicorn.Config(
+            app, host=host, port=port, log_level=log_level, log_config=None
+        )
+    else:
+        # per-request access lines would flood the console while a UI polls
+        config = uvicorn.Config(
+            app, host=host, port=port, log_level=log_level, access_log=False
+        )
+
+    server = StreamAwareServer(config)
+    t = threading.Thread(target=server.run, daemon=True)
     t.start()
-    return t
+    # the socket is bound by the time uvicorn reports started; a failed bind
+    # ends the thread instead
+    while not server.started:
+        if not t.is_alive():
+            raise RuntimeError(f"runner status server failed to start on {host}:{port}")
+        time.sleep(0.01)
+    return server.servers[0].sockets[0].getsockname()[1]
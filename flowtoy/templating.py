@@ -1,18 +1,63 @@
 from __future__ import annotations
 
-from typing import Any, Dict
+import re
+from functools import lru_cache
+from typing import Any, Callable, Dict, Optional, Tuple
 
 import jmespath
-from jinja2 import Environment, StrictUndefined
+from jinja2 import Environment, StrictUndefined, Template
 
 _jinja = Environment(undefined=StrictUndefined)
 
 
+@lru_cache(maxsize=1024)
+def _compile(template: str) -> Template:
+    return _jinja.from_string(template)
+
+
+@lru_cache(maxsize=512)
+def compile_jmespath(expr: str) -> jmespath.parser.ParsedResult:
+    """Return the parsed form of a JMESPath expression, cached by source.
+
+    Output expressions are static per config, so after the first call each
+    lookup only pays the search cost.
+    """
+    return jmespath.compile(expr)
+
+
+def _has_jinja_syntax(text: str) -> bool:
+    # every Jinja delimiter starts with "{", so most literal strings are
+    # rejected by that single scan before looking for the delimiters
+    return "{" in text and ("{{" in text or "{%" in text or "{#" in text)
+
+
 def render_template(template: str, context: Dict[str, Any]) -> str:
-    tpl = _jinja.from_string(template)
+    # plain strings skip Jinja; reproduce what rendering would do to them
+    # (newlines are normalised, and a single trailing newline is dropped)
+    if not _has_jinja_syntax(template):
+        if "\r" not in template:
+            return template[:-1] if template.endswith("\n") else template
+    tpl = _compile(template)
     return tpl.render(**(context or {}))
 
 
+def compile_template(template: str) -> Callable[[Dict[str, Any]], str]:
+    """Prepare ``template`` for repeated rendering.
+
+    Returns a function of the context that gives the same result as
+    ``render_template(template, context)``, with parsing done up front.
+
+    Raises:
+        jinja2.TemplateSyntaxError: If the template is invalid.
+    """
+    if not _has_jinja_syntax(template):
+        if "\r" not in template:
+            text = template[:-1] if template.endswith("\n") else template
+            return lambda context: text
+    render = _compile(template).render
+    return lambda context: render(**(context or {}))
+
+
 def render_dict_templates(obj: Any, context: Dict[str, Any]) -> Any:
     """Recursively render Jinja2 templates in dict/list structures.
 
@@ -29,15 +74,70 @@ def render_dict_templates(obj: Any, context: Dict[str, Any]) -> Any:
         return [render_dict_templates(item, context) for item in obj]
     elif isinstance(obj, str):
         # Only render if it looks like it contains template syntax
-        if "{{" in obj or "{%" in obj:
+        if "{" in obj and ("{{" in obj or "{%" in obj):
             return render_template(obj, context)
         return obj
     else:
         return obj
 
 
+def _compile_tree(obj: Any) -> Optional[Callable[[Dict[str, Any]], Any]]:
+    # None means obj is a leaf without templates and can be used as-is;
+    # containers are always rebuilt so callers may modify what they get
+    if isinstance(obj, dict):
+        dynamic = {}
+        for k, v in obj.items():
+            render = _compile_tree(v)
+            if render is not None:
+                dynamic[k] = render
+        return lambda context: {
+            k: dynamic[k](context) if k in dynamic else v for k, v in obj.items()
+        }
+    if isinstance(obj, list):
+        renders = [(item, _compile_tree(item)) for item in obj]
+        return lambda context: [
+            item if render is None else render(context) for item, render in renders
+        ]
+    if isinstance(obj, str) and "{" in obj and ("{{" in obj or "{%" in obj):
+        return compile_template(obj)
+    return None
+
+
+def compile_dict_templates(obj: Any) -> Callable[[Dict[str, Any]], Any]:
+    """Prepare ``render_dict_templates(obj, context)`` for repeated rendering.
+
+    The tree is scanned and its templates compiled once. Each call then only
+    renders the template strings; like ``render_dict_templates`` it returns
+    new dicts and lists, so nothing the caller modifies is shared with ``obj``.
+
+    Raises:
+        jinja2.TemplateSyntaxError: If a template in ``obj`` is invalid.
+    """
+    render = _compile_tree(obj)
+    return render if render is not None else (lambda context: obj)
+
+
+# JMESPath expressions made only of unquoted identifiers, e.g. ``a.b.c``
+_SIMPLE_PATH_RE = re.compile(r"[A-Za-z_][A-Za-z0-9_]*(?:\.[A-Za-z_][A-Za-z0-9_]*)*")
+
+
+@lru_cache(maxsize=512)
+def _simple_path(expr: str) -> Optional[Tuple[str, ...]]:
+    return tuple(expr.split(".")) if _SIMPLE_PATH_RE.fullmatch(expr) else None
+
+
 def extract_jmespath(expr: str, data: Any):
+    # plain dotted paths are evaluated the way JMESPath evaluates a field
+    # (``.get``, with None for anything that has no ``.get``), minus the AST walk
+    path = _simple_path(expr)
+    if path is not None:
+        for key in path:
+            try:
+                data = data.get(key)
+            except AttributeError:
+                return None
+        return data
     try:
-        return jmespath.search(expr, data)
+        return compile_jmespath(expr).search(data)
     except Exception:
         return None
@@ -1,17 +1,35 @@
 from __future__ import annotations
 
+import bisect
 import json
 import os
-from typing import Any, Dict, Optional
+import time
+from datetime import datetime
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Set, Tuple
 
 import requests
+from requests.adapters import HTTPAdapter
+from textual import work
 from textual.app import App, ComposeResult
 from textual.containers import Container, VerticalScroll
 from textual.reactive import reactive
-from textual.widgets import Footer, Header, Static
+from textual.timer import Timer
+from textual.widgets import Footer, Header, RichLog, Static
+from textual.worker import Worker, get_current_worker
+
+from .jsonutil import dumps_pretty, loads
 
 DEFAULT_STATUS_URL = "http://127.0.0.1:8005/status"
 
+# seconds to wait before polling again after 1, 2, 3, ... consecutive failed
+# fetches (the last value repeats); a successful fetch resets it
+RETRY_BACKOFF = (1.0, 2.0, 5.0, 10.0)
+
+# the outputs stream sends a keep-alive at least every 25s; a stream silent for
+# longer than this is treated as dead and reconnected
+STREAM_READ_TIMEOUT = 60.0
+
 # Unicode icons for step states (simple symbols, all 1 character)
 STATE_ICONS = {
     "pending": "◷",  # wait/clock
@@ -21,6 +39,11 @@ STATE_ICONS = {
 }
 
 
+# polls can arrive in bursts (e.g. a manual refresh right after a timer tick);
+# panels wait this long for the data to settle before rebuilding
+REBUILD_DEBOUNCE = 0.2
+
+
 def format_start_time(ts: Optional[float]) -> str:
     """Format a start timestamp as HH:MM:SS.
 
@@ -33,14 +56,17 @@ def format_start_time(ts: Optional[float]) -> str:
     if ts is None:
         return "-"
     try:
-        from datetime import datetime
-
-        dt = datetime.fromtimestamp(ts)
-        return dt.strftime("%H:%M:%S")
+        return _format_hms(int(ts))
     except (ValueError, TypeError, OSError):
         return "-"
 
 
+@lru_cache(maxsize=4096)
+def _format_hms(ts: int) -> str:
+    # the same start times are formatted on every poll
+    return datetime.fromtimestamp(ts).strftime("%H:%M:%S")
+
+
 def format_duration(start_ts: Optional[float], end_ts: Optional[float]) -> str:
     """Format duration between start and end as +X.Xs.
 
@@ -60,6 +86,10 @@ def format_duration(start_ts: Optional[float], end_ts: Optional[float]) -> str:
         return "-"
 
 
+# status table row from already padded columns; cheaper than format specs
+_ROW = "{} {} {} {} {} {}".format
+
+
 class StatusTable(VerticalScroll):
     """Scrollable widget to display status information in a table."""
 
@@ -68,24 +98,46 @@ class StatusTable(VerticalScroll):
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         self.border_title = "Runner"
+        self._static = Static("")
+        self._debounce_timer: Optional[Timer] = None
+        # text currently shown; a rebuild that renders the same text is skipped
+        self._text: Optional[str] = None
+        # step name -> (row signature, formatted row), see render_row
+        self._row_cache: Dict[str, Tuple[tuple, str]] = {}
+        # step names in display order, and the same names as a set
+        self._sorted_names: List[str] = []
+        self._known_names: Set[str] = set()
+
+    def compose(self) -> ComposeResult:
+        # a single Static, updated in place rather than remounted on change
+        yield self._static
 
     def watch_status_data(self, status: Dict[str, Any]) -> None:
-        """React to status data changes."""
-        # Remove existing content
-        self.remove_children()
+        """React to status data changes; the rebuild is debounced."""
+        if self._debounce_timer is not None:
+            self._debounce_timer.stop()
+        self._debounce_timer = self.set_timer(REBUILD_DEBOUNCE, self._rebuild)
+
+    def _rebuild(self) -> None:
+        self._debounce_timer = None
+        text = self.render_status(self.status_data)
+        # most polls change nothing visible (e.g. only the version moved)
+        if text == self._text:
+            return
+        self._text = text
+        self._static.update(text)
 
+    def render_status(self, status: Dict[str, Any]) -> str:
+        """Render the status payload as the panel's text."""
         if not status or status.get("status") == "no-runner":
-            self.mount(Static("No runner attached"))
-            return
+            return "No runner attached"
 
         if "_error" in status:
             error_msg = status.get("_error", "Unknown error")
             # Show a friendlier connection message
             if "Connection refused" in error_msg or "Max retries" in error_msg:
-                self.mount(Static("Waiting for runner to start..."))
-            else:
-                self.mount(Static(f"Error: {error_msg}"))
-            return
+                return "Waiting for runner to start..."
+            return f"Error: {error_msg}"
 
         run_id = status.get("run_id")
         total = status.get("total_steps")
@@ -114,27 +166,66 @@ class StatusTable(VerticalScroll):
         )
         lines.append("-" * 90)
 
+        # rows only change when their step does, so formatted rows are reused
+        # across polls; the cache is rebuilt to drop steps that went away
         steps = status.get("steps") or {}
-        for name in sorted(steps.keys()):
+        row_cache = self._row_cache
+        new_cache: Dict[str, Tuple[tuple, str]] = {}
+        for name in self._step_order(steps):
             info = steps[name]
-            state = str(info.get("state") or "-")
-            # Use icon for state, fallback to first 2 chars if no icon
-            state_display = STATE_ICONS.get(state, state[:2])
-
-            started_raw = info.get("started_at")
-            ended_raw = info.get("ended_at")
-            started = format_start_time(started_raw)
-            ended = format_duration(started_raw, ended_raw)
-
-            outputs = ", ".join(info.get("outputs") or []) or "-"
-            notes = ", ".join(info.get("notes") or []) or "-"
-
-            line = (
-                f"{name:24} {state_display} {started:8} {ended:9} {outputs:16} {notes}"
+            sig = (
+                info.get("state"),
+                info.get("started_at"),
+                info.get("ended_at"),
+                tuple(info.get("outputs") or ()),
+                tuple(info.get("notes") or ()),
             )
-            lines.append(line)
-
-        self.mount(Static("\n".join(lines)))
+            cached = row_cache.get(name)
+            if cached is None or cached[0] != sig:
+                cached = (sig, self.render_row(name, info))
+            new_cache[name] = cached
+            lines.append(cached[1])
+        self._row_cache = new_cache
+
+        return "\n".join(lines)
+
+    def _step_order(self, steps: Dict[str, Any]) -> List[str]:
+        """Return the names in ``steps`` sorted, reusing the last poll's order."""
+        names = steps.keys()
+        known = self._known_names
+        if names != known:
+            if known <= names:
+                # steps only appear during a run: insert the new ones
+                for name in names - known:
+                    bisect.insort(self._sorted_names, name)
+            else:
+                self._sorted_names = sorted(names)
+            self._known_names = set(names)
+        return self._sorted_names
+
+    @staticmethod
+    def render_row(name: str, info: Dict[str, Any]) -> str:
+        """Format one step's row of the status table."""
+        state = str(info.get("state") or "-")
+        # Use icon for state, fallback to first 2 chars if no icon
+        state_display = STATE_ICONS.get(state, state[:2])
+
+        started_raw = info.get("started_at")
+        ended_raw = info.get("ended_at")
+        started = format_start_time(started_raw)
+        ended = format_duration(started_raw, ended_raw)
+
+        outputs = ", ".join(info.get("outputs") or []) or "-"
+        notes = ", ".join(info.get("notes") or []) or "-"
+
+        return _ROW(
+            name.ljust(24),
+            state_display,
+            started.ljust(8),
+            ended.ljust(9),
+            outputs.ljust(16),
+            notes,
+        )
 
 
 class OutputsPanel(VerticalScroll):
@@ -145,39 +236,69 @@ class OutputsPanel(VerticalScroll):
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
         self.border_title = "Outputs (Scrollable)"
+        self._static = Static("")
+        self._debounce_timer: Optional[Timer] = None
+        # text currently shown; a rebuild that renders the same text is skipped
+        self._text: Optional[str] = None
+        # step name -> (outputs object, its JSON text), see render_outputs
+        self._step_text: Dict[str, Tuple[Any, str]] = {}
 
-    def watch_outputs_data(self, outputs: Dict[str, Any]) -> None:
-        """React to outputs data changes."""
-        if not outputs or "_error" in outputs:
-            content = "(no outputs)"
-        else:
-            content = json.dumps(outputs, indent=2)
-
-        # Update the content
-        self.remove_children()
-        self.mount(Static(content))
+    def compose(self) -> ComposeResult:
+        yield self._static
 
+    def watch_outputs_data(self, outputs: Dict[str, Any]) -> None:
+        """React to outputs data changes; the rebuild is debounced."""
+        if self._debounce_timer is not None:
+            self._debounce_timer.stop()
+        self._debounce_timer = self.set_timer(REBUILD_DEBOUNCE, self._rebuild)
+
+    def _rebuild(self) -> None:
+        self._debounce_timer = None
+        content = self.render_outputs(self.outputs_data)
+        if content == self._text:
+            return
+        self._text = content
+        self._static.update(content)
 
-class LogsPanel(VerticalScroll):
-    """Scrollable widget to display server logs."""
+    def render_outputs(self, outputs: Dict[str, Any]) -> str:
+        """Render outputs as JSON indented by two spaces.
 
-    logs_data: reactive[list] = reactive([])
+        Each step's part is cached against its outputs object; streamed updates
+        keep unchanged steps' objects, so only changed steps are re-encoded.
+        """
+        if not outputs or "_error" in outputs:
+            return "(no outputs)"
+        step_text = self._step_text
+        new_text: Dict[str, Tuple[Any, str]] = {}
+        parts = []
+        for name, value in outputs.items():
+            cached = step_text.get(name)
+            if cached is None or cached[0] is not value:
+                text = dumps_pretty(value).replace("\n", "\n  ")
+                cached = (value, f"  {json.dumps(name)}: {text}")
+            new_text[name] = cached
+            parts.append(cached[1])
+        self._step_text = new_text
+        return "{\n" + ",\n".join(parts) + "\n}"
+
+
+class LogsPanel(RichLog):
+    """Scrollable widget to display server logs.
+
+    New lines are appended as they arrive; only the last 100 are kept.
+    """
 
     def __init__(self, **kwargs):
-        super().__init__(**kwargs)
+        super().__init__(max_lines=100, **kwargs)
         self.border_title = "Server Logs (Scrollable)"
+        # number of LogCapture records already written
+        self._seen = 0
 
-    def watch_logs_data(self, logs: list) -> None:
-        """React to logs data changes."""
-        if not logs:
-            content = "(no logs)"
-        else:
-            # Show last 100 log entries
-            content = "\n".join(list(logs)[-100:])
-
-        # Update the content
-        self.remove_children()
-        self.mount(Static(content))
+    def update_from(self, log_capture: Any) -> None:
+        """Append the records ``log_capture`` has captured since the last call."""
+        self._seen, lines = log_capture.records_since(self._seen)
+        for line in lines:
+            self.write(line)
 
 
 class FlowToyTUI(App):
@@ -237,13 +358,48 @@ class FlowToyTUI(App):
         if self.status_url and not self.status_url.rstrip().endswith("/status"):
             self.status_url = self.status_url.rstrip("/") + "/status"
 
-        # Derive outputs URL from status URL
+        # Derive outputs and snapshot URLs from status URL
         self.outputs_url = self.status_url.replace("/status", "/outputs")
+        self.snapshot_url = self.status_url.replace("/status", "/snapshot")
+        self.outputs_stream_url = self.outputs_url + "/stream"
+        # cleared if the server has no /snapshot (older runners), after which
+        # status and outputs are fetched separately
+        self._use_snapshot = True
+        # set while the outputs stream is delivering; polls then fetch only
+        # /status (see _stream_outputs)
+        self._outputs_streaming = False
+        self._stream_response: Optional[requests.Response] = None
+        # status version the shown outputs are at least as new as, and the run
+        # it belongs to; polled snapshots and the stream race each other, so
+        # outputs older than this are dropped (see _show_outputs)
+        self._outputs_version = -1
+        self._run_id: Optional[Any] = None
 
         self.poll_interval = poll_interval
         self.show_logs = show_logs
         self.log_capture = log_capture
 
+        # one keep-alive session for all polling, so each refresh reuses the
+        # same connection to the runner; closed when the app unmounts
+        self._session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=2, pool_maxsize=2)
+        self._session.mount("http://", adapter)
+        self._session.mount("https://", adapter)
+
+        # ETags of the last /status and /snapshot responses, sent back as
+        # If-None-Match; kept apart since the two bodies differ
+        self._status_etag: Optional[str] = None
+        self._snapshot_etag: Optional[str] = None
+
+        # repeating poll timer, paused while the app is blurred
+        self._poll_timer: Optional[Timer] = None
+        # the in-flight fetch, if any; see update_data
+        self._poll_worker: Optional[Worker] = None
+        # consecutive failed fetches, and the monotonic time before which the
+        # timer does not poll again; see RETRY_BACKOFF
+        self._error_streak = 0
+        self._retry_at = 0.0
+
         # Store widget references
         self.status_widget = None
         self.outputs_widget = None
@@ -269,47 +425,202 @@ class FlowToyTUI(App):
 
     def on_mount(self) -> None:
         """Start the update timer when app is mounted."""
-        self.set_interval(self.poll_interval, self.update_data)
+        self._poll_timer = self.set_interval(self.poll_interval, self.update_data)
         # Do initial fetch immediately
         self.update_data()
+        self._stream_outputs()
+
+    def on_app_blur(self) -> None:
+        """Stop polling while the terminal is in the background."""
+        if self._poll_timer is not None:
+            self._poll_timer.pause()
+
+    def on_app_focus(self) -> None:
+        """Resume polling, with an immediate refresh, when the terminal is back."""
+        if self._poll_timer is not None:
+            self._poll_timer.resume()
+            self.update_data(force=True)
+
+    def on_unmount(self) -> None:
+        """Close the polling session's connections."""
+        # unblock the outputs stream's pending read so its worker can exit;
+        # HTTPResponse.shutdown needs urllib3 2.3+
+        response = self._stream_response
+        if response is not None:
+            getattr(response.raw, "shutdown", response.close)()
+        self._session.close()
+
+    def update_data(self, force: bool = False) -> None:
+        """Fetch and update all data from the runner API.
+
+        The HTTP request runs in a worker thread so a slow or unreachable
+        runner never blocks input; a tick is skipped while the previous fetch
+        is still in flight, or (unless ``force``) while backing off after
+        failed fetches.
+        """
+        in_flight = self._poll_worker is not None and not self._poll_worker.is_finished
+        if not in_flight and (force or time.monotonic() >= self._retry_at):
+            self._poll_worker = self._poll()
 
-    def update_data(self) -> None:
-        """Fetch and update all data from the runner API."""
-        # Fetch status
-        status = self.fetch_status()
-        if self.status_widget:
-            self.status_widget.status_data = status
+        # Update logs if enabled
+        if self.show_logs and self.log_capture and self.logs_widget:
+            self.logs_widget.update_from(self.log_capture)
 
-        # Fetch outputs
-        outputs = self.fetch_outputs()
+    @work(thread=True, group="poll")
+    def _poll(self) -> None:
+        if self._outputs_streaming:
+            status = self.fetch_status()
+            snapshot = None if status is None else {"status": status}
+        else:
+            snapshot = self.fetch_snapshot()
+        if snapshot is not None and "_error" in snapshot["status"]:
+            delay = RETRY_BACKOFF[min(self._error_streak, len(RETRY_BACKOFF) - 1)]
+            self._error_streak += 1
+            self._retry_at = time.monotonic() + delay
+        else:
+            self._error_streak = 0
+            self._retry_at = 0.0
+        # None means nothing changed since the last poll (the server's version
+        # covers outputs too), so both panels are left as-is
+        if snapshot is not None:
+            self.call_from_thread(self._show_snapshot, snapshot)
+
+    def _show_snapshot(self, snapshot: Dict[str, Any]) -> None:
+        status = snapshot.get("status")
+        version = None
+        if isinstance(status, dict):
+            if status.get("run_id") != self._run_id and "run_id" in status:
+                # a restarted server counts versions from zero again
+                self._run_id = status["run_id"]
+                self._outputs_version = -1
+            version = status.get("version")
+            if self.status_widget:
+                self.status_widget.status_data = status
+        if "outputs" in snapshot:
+            self._show_outputs(snapshot["outputs"], version)
+
+    def _show_outputs(
+        self, outputs: Dict[str, Any], version: Optional[int], reset: bool = False
+    ) -> None:
+        """Show ``outputs`` unless newer ones (by status version) are shown.
+
+        ``reset`` makes ``version`` the new baseline, for the first event of a
+        new stream connection.
+        """
+        if version is not None:
+            if version < self._outputs_version and not reset:
+                return
+            self._outputs_version = version
         if self.outputs_widget:
             self.outputs_widget.outputs_data = outputs
 
-        # Update logs if enabled
-        if self.show_logs and self.log_capture and self.logs_widget:
-            self.logs_widget.logs_data = list(self.log_capture.records)
+    @work(thread=True, group="outputs-stream")
+    def _stream_outputs(self) -> None:
+        """Follow ``/outputs/stream`` and apply each change to the outputs panel.
+
+        Only changed steps are transferred, instead of all outputs on every
+        change. Polling keeps covering outputs while the stream is down, and
+        for good if the server has no stream (404).
+        """
+        worker = get_current_worker()
+        failures = 0
+        while not worker.is_cancelled:
+            try:
+                with self._session.get(
+                    self.outputs_stream_url,
+                    stream=True,
+                    timeout=(3.0, STREAM_READ_TIMEOUT),
+                ) as r:
+                    if r.status_code == 404:
+                        return
+                    r.raise_for_status()
+                    self._stream_response = r
+                    outputs: Dict[str, Any] = {}
+                    version: Optional[int] = None
+                    first = True
+                    for line in r.iter_lines():
+                        if worker.is_cancelled:
+                            return
+                        if line.startswith(b"id:"):
+                            version = int(line[3:])
+                            continue
+                        if not line.startswith(b"data:"):
+                            continue
+                        # a new dict each time, so the panel sees a change
+                        outputs = {**outputs, **loads(line[5:])}
+                        outputs = {k: v for k, v in outputs.items() if v is not None}
+                        self._outputs_streaming = True
+                        failures = 0
+                        self.call_from_thread(
+                            self._show_outputs, outputs, version, first
+                        )
+                        first = False
+            except Exception:
+                pass
+            finally:
+                self._stream_response = None
+                self._outputs_streaming = False
+            time.sleep(RETRY_BACKOFF[min(failures, len(RETRY_BACKOFF) - 1)])
+            failures += 1
+
+    def fetch_snapshot(self, timeout: float = 3.0) -> Optional[Dict[str, Any]]:
+        """Fetch status and outputs from the runner API in one request.
+
+        Returns ``{"status": ..., "outputs": ...}``, or None when the server
+        reports nothing changed (HTTP 304).
+        """
+        if not self._use_snapshot:
+            status = self.fetch_status(timeout)
+            if status is None:
+                return None
+            return {"status": status, "outputs": self.fetch_outputs(timeout)}
+
+        headers = (
+            {"If-None-Match": self._snapshot_etag} if self._snapshot_etag else None
+        )
+        try:
+            r = self._session.get(self.snapshot_url, timeout=timeout, headers=headers)
+            if r.status_code == 304:
+                return None
+            if r.status_code == 404:
+                self._use_snapshot = False
+                return self.fetch_snapshot(timeout)
+            r.raise_for_status()
+            self._snapshot_etag = r.headers.get("ETag")
+            return loads(r.content)
+        except Exception as e:
+            self._snapshot_etag = None
+            return {"status": {"_error": str(e)}, "outputs": {"_error": str(e)}}
 
-    def fetch_status(self, timeout: float = 3.0) -> Dict[str, Any]:
-        """Fetch status from the runner API."""
+    def fetch_status(self, timeout: float = 3.0) -> Optional[Dict[str, Any]]:
+        """Fetch status from the runner API.
+
+        Returns None when the server reports the status unchanged (HTTP 304).
+        """
+        headers = {"If-None-Match": self._status_etag} if self._status_etag else None
         try:
-            r = requests.get(self.status_url, timeout=timeout)
+            r = self._session.get(self.status_url, timeout=timeout, headers=headers)
+            if r.status_code == 304:
+                return None
             r.raise_for_status()
-            return r.json()
+            self._status_etag = r.headers.get("ETag")
+            return loads(r.content)
         except Exception as e:
+            self._status_etag = None
             return {"_error": str(e)}
 
     def fetch_outputs(self, timeout: float = 3.0) -> Dict[str, Any]:
         """Fetch outputs from the runner API."""
         try:
-            r = requests.get(self.outputs_url, timeout=timeout)
+            r = self._session.get(self.outputs_url, timeout=timeout)
             r.raise_for_status()
-            return r.json()
+            return loads(r.content)
         except Exception as e:
             return {"_error": str(e)}
 
     def action_refresh(self) -> None:
         """Manual refresh action."""
-        self.update_data()
+        self.update_data(force=True)
 
 
 def run_tui(
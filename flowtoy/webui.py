@@ -1,14 +1,21 @@
 import os
 from pathlib import Path
+from typing import Optional
 
 import requests
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.responses import FileResponse, JSONResponse, Response
 from fastapi.staticfiles import StaticFiles
 
 from . import api as core_api
+from .jsonutil import response_class
 
-app = FastAPI()
+app = FastAPI(
+    default_response_class=response_class(), lifespan=core_api.threadpool_lifespan
+)
+
+# shared keep-alive session for proxying to RUNNER_STATUS_URL
+_SESSION = requests.Session()
 
 # static files served under /static so dynamic endpoints like /status are not
 # shadowed by the static mount.
@@ -19,6 +26,15 @@ if ui_path.exists():
     )
 
 
+def _passthrough(r: requests.Response) -> Response:
+    # relay the upstream body as-is; JSON is not parsed and re-serialized
+    if r.headers.get("content-type", "").startswith("application/json"):
+        media_type = "application/json"
+    else:
+        media_type = "text/plain"
+    return Response(r.content, status_code=r.status_code, media_type=media_type)
+
+
 @app.get("/")
 def index():
     idx = ui_path / "index.html"
@@ -28,22 +44,25 @@ def index():
 
 
 @app.get("/status")
-def status():
+def status(request: Request, since: Optional[int] = None):
     # if RUNNER_STATUS_URL is set, proxy requests to that runner status server
     runner_url = os.getenv("RUNNER_STATUS_URL")
     if runner_url:
         try:
             target = runner_url.rstrip("/") + "/status"
-            r = requests.get(target, timeout=5)
-            try:
-                return JSONResponse(r.json(), status_code=r.status_code)
-            except Exception:
-                return Response(
-                    r.text, status_code=r.status_code, media_type="text/plain"
+            if since is None:
+                r = _SESSION.get(target, timeout=5)
+            else:
+                # the upstream may hold a long-poll open for LONG_POLL_TIMEOUT
+                r = _SESSION.get(
+                    target,
+                    params={"since": since},
+                    timeout=core_api.LONG_POLL_TIMEOUT + 5,
                 )
+            return _passthrough(r)
         except Exception as e:
             return JSONResponse({"error": str(e)}, status_code=502)
-    return core_api.status()
+    return core_api.status(request, since)
 
 
 @app.get("/outputs")
@@ -52,13 +71,8 @@ def outputs():
     if runner_url:
         try:
             target = runner_url.rstrip("/") + "/outputs"
-            r = requests.get(target, timeout=5)
-            try:
-                return JSONResponse(r.json(), status_code=r.status_code)
-            except Exception:
-                return Response(
-                    r.text, status_code=r.status_code, media_type="text/plain"
-                )
+            r = _SESSION.get(target, timeout=5)
+            return _passthrough(r)
         except Exception as e:
             return JSONResponse({"error": str(e)}, status_code=502)
     return core_api.outputs()
@@ -1,4 +1,8 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from typing import Any, Dict, List
+from urllib.parse import parse_qs, urlparse
 
 import pytest
 
@@ -25,59 +29,82 @@ def make_runner():
     return _make
 
 
-import json
-import threading
-from http.server import BaseHTTPRequestHandler, HTTPServer
-from urllib.parse import parse_qs, urlparse
-
-import pytest
+# response bodies by path prefix; %s is the JSON-escaped ``id`` query parameter
+_BODIES = (
+    ("/hr", b'{"jobs": ["job-for-%s"]}'),
+    ("/sis/programs", b'{"programs": ["program-for-%s"]}'),
+    ("/sis/courses", b'{"courses": ["course-for-%s"]}'),
+)
+_NOT_FOUND = b'{"error": "not found"}'
 
 
 class SimpleHandler(BaseHTTPRequestHandler):
+    # HTTP/1.1 so clients can keep the connection open between requests
+    protocol_version = "HTTP/1.1"
+
     def do_GET(self):
         parsed = urlparse(self.path)
-        qs = parse_qs(parsed.query)
-        uid = qs.get("id", [None])[0]
         path = parsed.path
-        resp = {}
-        status = 200
-        if path.startswith("/hr"):
-            resp = {"jobs": [f"job-for-{uid}"]}
-        elif path.startswith("/sis/programs"):
-            resp = {"programs": [f"program-for-{uid}"]}
-        elif path.startswith("/sis/courses"):
-            resp = {"courses": [f"course-for-{uid}"]}
+        for prefix, template in _BODIES:
+            if path.startswith(prefix):
+                uid = parse_qs(parsed.query).get("id", [None])[0]
+                body = template % json.dumps(str(uid))[1:-1].encode("utf-8")
+                status = 200
+                break
         else:
+            body = _NOT_FOUND
             status = 404
-            resp = {"error": "not found"}
 
         self.send_response(status)
         self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
         self.end_headers()
-        self.wfile.write(json.dumps(resp).encode("utf-8"))
+        self.wfile.write(body)
 
     def log_message(self, format, *args):
         # suppress default logging in tests
         pass
 
 
+class CountingHTTPServer(ThreadingHTTPServer):
+    """Threaded server that counts accepted connections.
+
+    Keep-alive connections hold a handler thread each, so the server has to
+    be threaded; ``connection_count`` lets tests check connection reuse.
+    """
+
+    daemon_threads = True
+    connection_count = 0
+
+    def process_request(self, request, client_address):
+        # called from the single serve_forever thread, so no lock is needed
+        self.connection_count += 1
+        super().process_request(request, client_address)
+
+
 def _start_server():
-    srv = HTTPServer(("127.0.0.1", 0), SimpleHandler)
+    srv = CountingHTTPServer(("127.0.0.1", 0), SimpleHandler)
     thread = threading.Thread(target=srv.serve_forever, daemon=True)
     thread.start()
     return srv
 
 
-@pytest.fixture(scope="function")
-def http_server():
-    """Start a simple HTTP server and yield its base URL for tests.
+@pytest.fixture(scope="session")
+def http_test_server():
+    """Start a simple HTTP server and yield the server object.
 
-    The handler serves /hr, /sis/programs and /sis/courses paths.
+    The handler serves /hr, /sis/programs and /sis/courses paths. It keeps no
+    state between requests, so one server is shared by the whole session.
     """
     srv = _start_server()
     try:
-        base = f"http://127.0.0.1:{srv.server_address[1]}"
-        yield base
+        yield srv
     finally:
         srv.shutdown()
         srv.server_close()
+
+
+@pytest.fixture(scope="session")
+def http_server(http_test_server):
+    """Base URL of the shared test HTTP server."""
+    return f"http://127.0.0.1:{http_test_server.server_address[1]}"
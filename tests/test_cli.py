@@ -0,0 +1,29 @@
+import socket
+
+from typer.testing import CliRunner
+
+from flowtoy.cli import cli
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def test_run_with_status_port_fails_when_the_run_raises(tmp_path):
+    # an unknown dependency makes run() raise; with a status server the
+    # command must still stop and exit non-zero instead of serving forever
+    cfg = tmp_path / "flow.yaml"
+    cfg.write_text(
+        "sources: {}\n"
+        "flow:\n"
+        "  - name: a\n"
+        "    source: {type: env, configuration: {vars: []}}\n"
+        "    depends_on: [missing]\n"
+    )
+    result = CliRunner().invoke(
+        cli, ["run", str(cfg), "--status-port", str(_free_port())]
+    )
+    assert result.exit_code != 0
+    assert isinstance(result.exception, ValueError)
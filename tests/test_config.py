@@ -0,0 +1,46 @@
+from flowtoy.config import deep_merge
+
+
+def test_deep_merge_merges_nested_dicts_without_aliasing():
+    a = {"sources": {"api": {"type": "rest", "headers": {"x": "1"}}}, "flow": [1]}
+    b = {"sources": {"api": {"headers": {"y": "2"}}, "env": {"type": "env"}}}
+
+    out = deep_merge(a, b)
+
+    assert out == {
+        "sources": {
+            "api": {"type": "rest", "headers": {"x": "1", "y": "2"}},
+            "env": {"type": "env"},
+        },
+        "flow": [1],
+    }
+    # mutating the result must not leak back into either input
+    out["sources"]["api"]["headers"]["z"] = "3"
+    out["sources"]["env"]["type"] = "changed"
+    out["flow"].append(2)
+    assert a["sources"]["api"]["headers"] == {"x": "1"}
+    assert b["sources"]["env"] == {"type": "env"}
+    assert a["flow"] == [1]
+
+
+def test_load_yaml_files_rereads_changed_files(tmp_path):
+    from flowtoy.config import load_yaml_files
+
+    path = tmp_path / "flow.yaml"
+    path.write_text("runner:\n  max_workers: 2\n")
+    first = load_yaml_files([str(path)])
+    # results are independent copies of the cached document
+    first["runner"]["max_workers"] = 99
+    assert load_yaml_files([str(path)]) == {"runner": {"max_workers": 2}}
+
+    path.write_text("runner:\n  max_workers: 10\n")
+    assert load_yaml_files([str(path)]) == {"runner": {"max_workers": 10}}
+
+
+def test_load_yaml_files_can_limit_sections(tmp_path):
+    from flowtoy.config import RUNNER_KEYS, load_yaml_files
+
+    path = tmp_path / "flow.yaml"
+    path.write_text("flow: []\nx-defaults:\n  big: [1, 2, 3]\nrunner: {}\n")
+    assert load_yaml_files([str(path)], RUNNER_KEYS) == {"flow": [], "runner": {}}
+    assert "x-defaults" in load_yaml_files([str(path)])
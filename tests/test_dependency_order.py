@@ -50,3 +50,40 @@ def test_dependency_order(make_runner):
     assert s_a.ended_at is not None
     assert s_b.started_at is not None
     assert s_b.started_at >= s_a.ended_at
+
+
+def test_request_stop_leaves_dependents_pending(make_runner):
+    steps = [
+        {"name": "a", "source": {"type": "env", "configuration": {"vars": []}}},
+        {
+            "name": "b",
+            "depends_on": ["a"],
+            "source": {"type": "env", "configuration": {"vars": []}},
+        },
+    ]
+    r = make_runner(steps)
+    r.request_stop()
+    r.run()
+    assert r.status.steps["a"].state == "succeeded"
+    assert r.status.steps["b"].state == "pending"
+    assert r.status.ended_at is not None
+
+    # the stop request only applies to the run it interrupted
+    r.run()
+    assert r.status.steps["b"].state == "succeeded"
+
+
+def test_step_ref_scanner_matches_regex():
+    import re
+
+    from flowtoy.runner import _iter_step_refs
+
+    pattern = re.compile(r"flows\.([A-Za-z0-9_]+)\.")
+    samples = [
+        "{{ flows.a.x }} {{ flows.b_2.y }}",
+        "flows.a flows..b. flows.c.d.e flows.é.x",
+        "xflows.a.b flows.flows.c. flows.",
+        "",
+    ]
+    for text in samples:
+        assert list(_iter_step_refs(text)) == pattern.findall(text)
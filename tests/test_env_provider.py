@@ -11,3 +11,18 @@ def test_env_provider(monkeypatch):
     assert res["data"]["TEST_A"] == "value-a"
     assert res["data"]["TEST_B"] == "value-b"
     assert res["data"]["MISSING"] is None
+
+
+def test_provider_processes_runs_steps(monkeypatch, make_runner):
+    monkeypatch.setenv("TEST_A", "value-a")
+    steps = [
+        {
+            "name": "e",
+            "source": {"type": "env", "configuration": {"vars": ["TEST_A"]}},
+            "output": [{"name": "a", "type": "jmespath", "value": "TEST_A"}],
+        }
+    ]
+    r = make_runner(steps, {"provider_processes": 1})
+    r.run()
+    assert r.status.steps["e"].state == "succeeded"
+    assert r.flows["e"]["a"] == "value-a"
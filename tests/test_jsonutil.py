@@ -0,0 +1,52 @@
+import json
+
+from flowtoy.jsonutil import dump_pretty, dumps_pretty, loads
+
+
+def test_loads_accepts_bytes_and_str():
+    assert loads(b'{"a": [1, 2]}') == {"a": [1, 2]}
+    assert loads('{"a": [1, 2]}') == {"a": [1, 2]}
+
+
+def test_loads_falls_back_for_values_orjson_rejects():
+    # NaN is accepted by the stdlib parser but rejected by orjson
+    value = loads(b"[NaN]")[0]
+    assert value != value
+
+
+def test_loads_keeps_wide_integers_exact():
+    # orjson would read this as a float
+    assert loads(b'{"n": 123456789012345678901234567890}') == {
+        "n": 123456789012345678901234567890
+    }
+    assert loads("[18446744073709551616]") == [2**64]
+
+
+def test_dumps_pretty_matches_json_layout():
+    data = {"a": {"b": [1, 2]}, "big": 2**70}
+    assert dumps_pretty(data) == json.dumps(data, indent=2)
+    assert dumps_pretty({"a": 1}) == json.dumps({"a": 1}, indent=2)
+
+
+def test_dump_pretty_writes_same_text_as_dumps_pretty():
+    import io
+
+    for data in ({"a": {"b": [1, 2]}, "big": 2**70}, {"a": 1}):
+        buf = io.BytesIO()
+        dump_pretty(data, buf)
+        assert buf.getvalue().decode("utf-8") == dumps_pretty(data)
+
+
+def test_pretty_output_does_not_depend_on_orjson(monkeypatch):
+    import io
+
+    from flowtoy import jsonutil
+
+    data = {"name": "café ☕", "big": 2**70}
+    fast = jsonutil.dumps_pretty({"name": "café ☕"})
+    monkeypatch.setattr(jsonutil, "orjson", None)
+    assert jsonutil.dumps_pretty({"name": "café ☕"}) == fast
+    buf = io.BytesIO()
+    jsonutil.dump_pretty(data, buf)
+    assert buf.getvalue().decode("utf-8") == jsonutil.dumps_pretty(data)
+    assert "café ☕" in jsonutil.dumps_pretty(data)
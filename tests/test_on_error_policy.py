@@ -45,3 +45,35 @@ def test_on_error_policies(make_runner):
     assert r.status.steps["skipped_dep"].state == "skipped"
     # continued should run despite failure since its policy is continue
     assert r.status.steps["continued"].state == "succeeded"
+
+
+def test_skip_propagates_down_deep_chain(make_runner):
+    # a chain longer than the recursion limit must still be skipped end to end
+    python = sys.executable
+    depth = sys.getrecursionlimit() + 100
+    steps = [
+        {
+            "name": "root",
+            "source": {
+                "type": "process",
+                "configuration": {"command": [python, "-c", "import sys; sys.exit(1)"]},
+            },
+            "input": {"type": "parameter", "value": ""},
+        }
+    ]
+    for i in range(depth):
+        steps.append(
+            {
+                "name": f"s{i}",
+                "depends_on": ["root" if i == 0 else f"s{i - 1}"],
+                "on_error": "skip",
+                "source": {"type": "process", "configuration": {"command": ["true"]}},
+                "input": {"type": "parameter", "value": ""},
+            }
+        )
+
+    r = make_runner(steps, runner_conf={"max_workers": 1})
+    r.run()
+
+    assert r.status.steps["root"].state == "failed"
+    assert all(r.status.steps[f"s{i}"].state == "skipped" for i in range(depth))
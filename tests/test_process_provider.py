@@ -1,11 +1,17 @@
+import asyncio
+import logging
 import subprocess
+import sys
 
 import jinja2
+import pytest
 
-from flowtoy.providers.process import ProcessProvider
+from flowtoy.providers.process import ProcessProvider, _arg_renderer, _compile_arg
 
 
 class DummyCompleted:
+    __slots__ = ("stdout", "stderr", "returncode")
+
     def __init__(self, stdout=b"", stderr=b"", returncode=0):
         self.stdout = stdout
         self.stderr = stderr
@@ -41,6 +47,25 @@ def test_nonjson_stdout(monkeypatch):
     assert res["status"]["success"] is False
 
 
+def test_parse_json_modes(monkeypatch):
+    outputs = {
+        "  [1, 2]\n": [1, 2],
+        "42\n": 42,
+        "null": None,
+        "not json": "not json",
+    }
+
+    def fake_run(cmd, input, stdout, stderr, timeout=None):
+        return DummyCompleted(stdout=cmd[-1].encode(), stderr=b"", returncode=0)
+
+    monkeypatch.setattr(subprocess, "run", fake_run)
+    auto = ProcessProvider({"command": ["/bin/echo"]})
+    never = ProcessProvider({"command": ["/bin/echo"], "parse_json": "never"})
+    for raw, expected in outputs.items():
+        assert auto.call(raw)["data"] == expected
+    assert never.call("[1, 2]")["data"] == "[1, 2]"
+
+
 def test_pass_to_stdin(monkeypatch):
     captured = {}
 
@@ -96,6 +121,86 @@ def test_template_renders_with_jmespath(monkeypatch):
     assert res["status"]["success"] is True
 
 
+def test_template_compiled_once_across_calls(monkeypatch):
+    captured = []
+
+    def fake_run(cmd, input, stdout, stderr, timeout=None):
+        captured.append(cmd)
+        return DummyCompleted(stdout=b"ok", stderr=b"", returncode=0)
+
+    monkeypatch.setattr(subprocess, "run", fake_run)
+
+    cfg = {
+        "command": ["/usr/bin/myprog", "--foo={{ json.name }}"],
+        "pass_to": "template",
+    }
+    ProcessProvider(cfg).call('{"name": "alice"}')
+    misses = _compile_arg.cache_info().misses
+    # a fresh provider for the same source reuses the compiled templates
+    ProcessProvider(cfg).call('{"name": "bob"}')
+
+    assert [c[1] for c in captured] == ["--foo=alice", "--foo=bob"]
+    assert _compile_arg.cache_info().misses == misses
+
+
+def test_template_args_keep_boundaries(monkeypatch):
+    # args are rendered in one pass, but values containing the internal
+    # separator or whitespace control must not merge or split args
+    captured = []
+
+    def fake_run(cmd, input, stdout, stderr, timeout=None):
+        captured.append(cmd)
+        return DummyCompleted(stdout=b"ok", stderr=b"", returncode=0)
+
+    monkeypatch.setattr(subprocess, "run", fake_run)
+
+    cmd = ["prog", "{{ json.a }}", "x {{- json.b }}", "{{ json.a }}!"]
+    pc = ProcessProvider({"command": cmd, "pass_to": "template"})
+    pc.call('{"a": "one", "b": "two"}')
+    pc.call('{"a": "o\\u001ene", "b": "two"}')
+
+    assert captured[0] == ["prog", "one", "xtwo", "one!"]
+    assert captured[1] == ["prog", "o\x1ene", "xtwo", "o\x1ene!"]
+    pc = ProcessProvider({"command": cmd[:2] + cmd[3:], "pass_to": "template"})
+    pc.call('{"a": "o\\u001ene"}')
+    assert captured[2] == ["prog", "o\x1ene", "o\x1ene!"]
+
+    # a trailing newline is stripped per arg, as rendering each arg would
+    pc = ProcessProvider(
+        {"command": ["prog", "{{ json.a }}\n", "{{ json.a }}"], "pass_to": "template"}
+    )
+    pc.call('{"a": "x"}')
+    assert captured[3] == ["prog", "x", "x"]
+
+    # variables set in one arg don't leak into the next
+    pc = ProcessProvider(
+        {
+            "command": ["prog", "{% set v = 1 %}{{ v }}", "{{ v }}"],
+            "pass_to": "template",
+        }
+    )
+    with pytest.raises(jinja2.exceptions.UndefinedError):
+        pc.call('{"a": "x"}')
+    assert len(captured) == 4
+
+
+def test_template_args_rendered_one_by_one_when_context_has_separator(monkeypatch):
+    render = _arg_renderer(False, ("prog", "{{ a }}", "{{ b[0].c }}"))
+    rendered = []
+    orig = jinja2.Template.render
+
+    def spy(self, *args, **kwargs):
+        rendered.append(self)
+        return orig(self, *args, **kwargs)
+
+    monkeypatch.setattr(jinja2.Template, "render", spy)
+    assert render({"a": "x", "b": [{"c": "y"}]}) == ["prog", "x", "y"]
+    assert len(rendered) == 1
+    rendered.clear()
+    assert render({"a": "x", "b": [{"c": "y\x1ez"}]}) == ["prog", "x", "y\x1ez"]
+    assert len(rendered) == 2
+
+
 def test_template_missing_variable_raises(monkeypatch):
     # templates should raise for missing variables (StrictUndefined)
     pc = ProcessProvider(
@@ -113,3 +218,111 @@ def test_template_missing_variable_raises(monkeypatch):
         assert isinstance(e, jinja2.exceptions.UndefinedError)
 
     assert raised is True
+
+
+def test_acall_json_stdout():
+    pc = ProcessProvider(
+        {
+            "command": [
+                sys.executable,
+                "-c",
+                "import json; print(json.dumps({'ok': True}))",
+            ]
+        }
+    )
+    res = asyncio.run(pc.acall(None))
+    assert res["status"]["success"] is True
+    assert res["data"] == {"ok": True}
+
+
+def test_acall_pass_to_stdin():
+    pc = ProcessProvider(
+        {
+            "command": [
+                sys.executable,
+                "-c",
+                "import sys; sys.stdout.write(sys.stdin.read().upper())",
+            ],
+            "pass_to": "stdin",
+        }
+    )
+    res = asyncio.run(pc.acall("payload"))
+    assert res["data"] == "PAYLOAD"
+    assert res["meta"]["returncode"] == 0
+
+
+def test_acall_timeout_kills_process():
+    pc = ProcessProvider(
+        {
+            "command": [sys.executable, "-c", "import time; time.sleep(5)"],
+            "timeout": 0.2,
+        }
+    )
+    res = asyncio.run(pc.acall(None))
+    assert res["status"]["success"] is False
+    assert res["status"]["notes"] == ["timeout"]
+    assert res["meta"]["timeout"] is True
+
+
+def test_sanitize_skipped_when_info_disabled(monkeypatch, caplog):
+    caplog.set_level(logging.WARNING, logger="flowtoy.providers.process")
+
+    def fake_run(cmd, input, stdout, stderr, timeout=None):
+        return DummyCompleted(stdout=b"ok", stderr=b"", returncode=0)
+
+    def fail_sanitize(*args, **kwargs):
+        raise AssertionError("command sanitized although INFO is disabled")
+
+    monkeypatch.setattr(subprocess, "run", fake_run)
+    pc = ProcessProvider({"command": ["/bin/echo", "secret"]})
+    monkeypatch.setattr(pc, "_sanitize_for_logging", fail_sanitize)
+
+    res = pc.call(None)
+    assert res["status"]["success"] is True
+
+
+# answers each framed request with {"pid": ..., "echo": <payload>}
+_ECHO_WORKER = r"""
+import json, os, sys
+inp, out = sys.stdin.buffer, sys.stdout.buffer
+while True:
+    head = inp.read(4)
+    if len(head) < 4:
+        break
+    payload = inp.read(int.from_bytes(head, "little")).decode()
+    if payload == "hang":
+        continue
+    body = json.dumps({"pid": os.getpid(), "echo": payload}).encode()
+    out.write(len(body).to_bytes(4, "little") + body)
+    out.flush()
+"""
+
+
+def test_persistent_worker_reused_across_calls():
+    cfg = {"command": [sys.executable, "-c", _ECHO_WORKER], "persistent": True}
+    first = ProcessProvider(cfg).call("one")
+    second = ProcessProvider(cfg).call("two")
+
+    assert first["status"]["success"] is True
+    assert first["data"]["echo"] == "one"
+    assert second["data"]["echo"] == "two"
+    assert first["data"]["pid"] == second["data"]["pid"]
+
+
+def test_persistent_worker_replaced_after_timeout():
+    cfg = {
+        "command": [sys.executable, "-c", _ECHO_WORKER, "timeout"],
+        "persistent": True,
+        "timeout": 0.5,
+    }
+    pc = ProcessProvider(cfg)
+    before = pc.call("x")["data"]["pid"]
+
+    res = pc.call("hang")
+    assert res["status"]["success"] is False
+    assert res["meta"]["timeout"] is True
+
+    # the stuck worker was discarded; the next call starts a fresh one
+    after = pc.call("y")
+    assert after["data"]["echo"] == "y"
+    assert after["data"]["pid"] != before
@@ -0,0 +1,27 @@
+import pytest
+
+from flowtoy import providers
+from flowtoy.providers import create_provider
+
+
+def test_create_provider_caches_constructor():
+    create_provider("env", {})
+    ctor = providers._ctor_cache["env"]
+    assert isinstance(create_provider("env", {}), ctor)
+
+
+def test_unknown_provider_lists_available():
+    with pytest.raises(ImportError) as exc_info:
+        create_provider("no-such-provider", {})
+    msg = str(exc_info.value)
+    assert "no-such-provider" in msg
+    assert "process" in msg and "rest" in msg
+
+
+def test_clear_cache_resets_resolution():
+    create_provider("env", {})
+    providers.clear_cache()
+    assert providers._ctor_cache == {}
+    assert not providers._entry_points_discovered
+    create_provider("env", {})
+    assert "env" in providers._ctor_cache
@@ -1,12 +1,19 @@
+import json
+
 from flowtoy.providers.rest import RestProvider
 
 
 class DummyResponse:
+    __slots__ = ("status_code", "headers", "_json", "text", "content")
+
     def __init__(self, status_code=200, headers=None, json_data=None, text_data=""):
         self.status_code = status_code
         self.headers = headers or {}
         self._json = json_data
         self.text = text_data
+        self.content = (
+            json.dumps(json_data) if json_data is not None else text_data
+        ).encode("utf-8")
 
     def json(self):
         if self._json is None:
@@ -20,7 +27,7 @@ def test_rest_provider_json(monkeypatch):
             status_code=200, headers={"h": "v"}, json_data={"user": "alice"}
         )
 
-    monkeypatch.setattr("flowtoy.providers.rest.requests.request", fake_request)
+    monkeypatch.setattr("flowtoy.providers.rest._SESSION.request", fake_request)
     rc = RestProvider({"url": "https://example.test/api", "method": "GET"})
     res = rc.call(None)
     assert isinstance(res, dict)
@@ -29,13 +36,27 @@ def test_rest_provider_json(monkeypatch):
     assert res["meta"]["headers"]["h"] == "v"
 
 
+def test_rest_provider_headers_are_plain_dict(monkeypatch):
+    from requests.structures import CaseInsensitiveDict
+
+    def fake_request(method, url, params=None, json=None, headers=None):
+        return DummyResponse(
+            headers=CaseInsensitiveDict({"X-Id": "7"}), json_data={"ok": True}
+        )
+
+    monkeypatch.setattr("flowtoy.providers.rest._SESSION.request", fake_request)
+    res = RestProvider({"url": "https://example.test/api"}).call(None)
+    assert type(res["meta"]["headers"]) is dict
+    assert json.loads(json.dumps(res["meta"]))["headers"] == {"X-Id": "7"}
+
+
 def test_rest_provider_text(monkeypatch):
     def fake_request(method, url, params=None, json=None, headers=None):
         return DummyResponse(
             status_code=200, headers={}, json_data=None, text_data="plain text"
         )
 
-    monkeypatch.setattr("flowtoy.providers.rest.requests.request", fake_request)
+    monkeypatch.setattr("flowtoy.providers.rest._SESSION.request", fake_request)
     rc = RestProvider({"url": "https://example.test/api", "method": "GET"})
     res = rc.call(None)
     assert isinstance(res, dict)
@@ -49,7 +70,7 @@ def test_rest_provider_500(monkeypatch):
             status_code=500, headers={}, json_data=None, text_data="server error"
         )
 
-    monkeypatch.setattr("flowtoy.providers.rest.requests.request", fake_request)
+    monkeypatch.setattr("flowtoy.providers.rest._SESSION.request", fake_request)
     rc = RestProvider({"url": "https://example.test/api", "method": "GET"})
     res = rc.call(None)
     assert isinstance(res, dict)
@@ -64,10 +85,94 @@ def test_rest_provider_404(monkeypatch):
             status_code=404, headers={}, json_data=None, text_data="not found"
         )
 
-    monkeypatch.setattr("flowtoy.providers.rest.requests.request", fake_request)
+    monkeypatch.setattr("flowtoy.providers.rest._SESSION.request", fake_request)
     rc = RestProvider({"url": "https://example.test/api", "method": "GET"})
     res = rc.call(None)
     assert isinstance(res, dict)
     assert res["status"]["success"] is False
     assert res["status"]["code"] == 404
     assert "HTTP status 404" in res["status"]["notes"]
+
+
+def test_rest_provider_limits_concurrency_per_host(monkeypatch):
+    import threading
+    import time
+
+    from flowtoy.providers import rest
+
+    lock = threading.Lock()
+    active = {"now": 0, "max": 0}
+
+    def fake_request(method, url, params=None, json=None, headers=None):
+        with lock:
+            active["now"] += 1
+            active["max"] = max(active["max"], active["now"])
+        time.sleep(0.02)
+        with lock:
+            active["now"] -= 1
+        return DummyResponse(status_code=200, json_data={})
+
+    monkeypatch.setattr("flowtoy.providers.rest._SESSION.request", fake_request)
+    rc = RestProvider({"url": "https://limited.test/api"})
+    threads = [threading.Thread(target=rc.call) for _ in range(rest._MAX_PER_HOST * 3)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert 1 < active["max"] <= rest._MAX_PER_HOST
+
+
+def test_rest_provider_acall_overlaps_requests(monkeypatch):
+    import asyncio
+    import time
+
+    def fake_request(method, url, params=None, json=None, headers=None):
+        time.sleep(0.2)
+        return DummyResponse(status_code=200, json_data={"url": url})
+
+    monkeypatch.setattr("flowtoy.providers.rest._SESSION.request", fake_request)
+    urls = [f"https://host{i}.test/api" for i in range(4)]
+
+    async def fan_out():
+        return await asyncio.gather(*(RestProvider({"url": u}).acall() for u in urls))
+
+    started = time.monotonic()
+    results = asyncio.run(fan_out())
+    assert time.monotonic() - started < 0.6
+    assert [r["data"]["url"] for r in results] == urls
+
+
+def test_sequential_rest_steps_reuse_one_connection(http_server, http_test_server):
+    from flowtoy.providers import rest
+    from flowtoy.runner import LocalRunner
+
+    paths = ["/hr", "/sis/programs", "/sis/courses", "/hr", "/sis/programs"]
+    steps = []
+    for i, path in enumerate(paths):
+        step = {
+            "name": f"s{i}",
+            "source": {
+                "type": "rest",
+                "configuration": {
+                    "url": http_server + path,
+                    "input_mode": "parameter",
+                },
+            },
+            "input": {"type": "parameter", "value": f"u{i}"},
+            "output": [{"name": "body", "type": "json"}],
+        }
+        if i:
+            step["depends_on"] = [f"s{i - 1}"]
+        steps.append(step)
+
+    # drop idle pooled connections so the count starts from a fresh socket
+    rest._SESSION.close()
+    before = http_test_server.connection_count
+    r = LocalRunner({"sources": {}, "flow": steps})
+    r.run()
+
+    assert all(r.status.steps[s["name"]].state == "succeeded" for s in steps)
+    assert r.flows["s4"]["body"] == {"programs": ["program-for-u4"]}
+    # all five requests went over a single keep-alive connection
+    assert http_test_server.connection_count - before == 1
@@ -150,3 +150,35 @@ def test_empty_command():
     sanitized = provider._sanitize_for_logging([], cfg)
 
     assert sanitized == []
+
+
+def test_sanitize_meta_redacts_matching_keys():
+    """Meta keys containing a redact term are masked, case-insensitively."""
+    from flowtoy.providers.result import sanitize_meta
+
+    meta = {"API_Token": "abc", "url": "http://x", "db_password": "pw1"}
+    assert sanitize_meta(meta) == {
+        "API_Token": "<redacted>",
+        "url": "http://x",
+        "db_password": "<redacted>",
+    }
+    assert sanitize_meta(meta, ["url"]) == {
+        "API_Token": "abc",
+        "url": "<redacted>",
+        "db_password": "pw1",
+    }
+
+
+def test_redaction_returns_independent_lists():
+    """Each call returns its own list, so callers can't affect later calls."""
+    cfg = {"command": ["tool", "--key", "SECRET"], "redact_args": [2]}
+    provider = ProcessProvider(cfg)
+
+    first = provider._sanitize_for_logging(["tool", "--key", "SECRET"], cfg)
+    first.append("mutated")
+    second = provider._sanitize_for_logging(["tool", "--key", "SECRET"], cfg)
+    assert second == ["tool", "--key", "[REDACTED]"]
+
+    # non-string args are matched by their string form
+    odd = provider._sanitize_for_logging(["tool", ["x"], "SECRET"], cfg)
+    assert odd == ["tool", ["x"], "[REDACTED]"]
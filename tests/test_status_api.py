@@ -3,6 +3,7 @@ import time
 
 import requests
 
+from flowtoy.runner import StepStatus
 from flowtoy.runner_api import serve_runner_api_in_thread
 
 
@@ -33,3 +34,313 @@ def test_status_api(make_runner):
     data = resp.json()
     assert data.get("total_steps") == 1
     assert data.get("completed_steps") == 1
+
+
+def test_status_api_etag(make_runner):
+    python = sys.executable
+    steps = [
+        {
+            "name": "one",
+            "source": {
+                "type": "process",
+                "configuration": {"command": [python, "-c", "print('ok')"]},
+            },
+            "input": {"type": "parameter", "value": ""},
+        },
+    ]
+
+    r = make_runner(steps)
+    serve_runner_api_in_thread(r, host="127.0.0.1", port=8011)
+    r.run()
+    time.sleep(0.1)
+
+    url = "http://127.0.0.1:8011/status"
+    first = requests.get(url, timeout=5)
+    etag = first.headers.get("ETag")
+    assert first.status_code == 200 and etag
+
+    # unchanged status: 304 with no body
+    again = requests.get(url, headers={"If-None-Match": etag}, timeout=5)
+    assert again.status_code == 304
+    assert again.content == b""
+
+    # any status change invalidates the tag
+    r._update_step_status("one", state="succeeded")
+    changed = requests.get(url, headers={"If-None-Match": etag}, timeout=5)
+    assert changed.status_code == 200
+    assert changed.headers.get("ETag") != etag
+
+
+def test_status_cache_reuses_body_until_version_changes(make_runner):
+    from starlette.requests import Request
+
+    from flowtoy.api import StatusCache
+
+    r = make_runner([])
+    calls = []
+
+    def build(runner):
+        calls.append(runner.status.version)
+        return {"version": runner.status.version}
+
+    cache = StatusCache()
+    request = Request({"type": "http", "headers": []})
+    first = cache.respond(r, request, build)
+    second = cache.respond(r, request, build)
+    assert second.body == first.body
+    assert calls == [0]
+
+    r.status.version += 1
+    third = cache.respond(r, request, build)
+    assert third.body == b'{"version":1}'
+    assert third.headers["ETag"] != first.headers["ETag"]
+    assert calls == [0, 1]
+
+
+def test_run_status_tracks_counters_incrementally(make_runner):
+    r = make_runner(
+        [
+            {"name": "a", "source": {"type": "process", "configuration": {}}},
+            {"name": "b", "source": {"type": "process", "configuration": {}}},
+        ]
+    )
+    r.status.steps = {"a": StepStatus("a"), "b": StepStatus("b")}
+
+    r._update_step_status("a", state="running")
+    r._update_step_status("b", state="running")
+    assert list(r.status.running) == ["a", "b"]
+    assert r.status.completed == 0
+
+    r._update_step_status("a", state="succeeded")
+    r._update_step_status("b", state="failed")
+    assert list(r.status.running) == []
+    assert r.status.completed == 2
+
+
+def test_step_status_records_output_names(make_runner):
+    from flowtoy.api import build_status
+
+    python = sys.executable
+    r = make_runner(
+        [
+            {
+                "name": "one",
+                "source": {
+                    "type": "process",
+                    "configuration": {"command": [python, "-c", "print('{}')"]},
+                },
+                "output": [
+                    {"name": "x", "type": "json"},
+                    {"name": "y", "type": "json"},
+                ],
+            },
+        ]
+    )
+    r.run()
+
+    assert r.status.steps["one"].outputs == ("x", "y")
+    assert build_status(r)["steps"]["one"]["outputs"] == ["x", "y"]
+
+
+def test_status_long_poll_waits_for_change(make_runner):
+    import threading
+
+    from flowtoy.api import wait_for_version
+
+    r = make_runner([])
+    since = r.status.version
+
+    # nothing changes: returns after the timeout
+    started = time.monotonic()
+    wait_for_version(r, since, timeout=0.05)
+    assert time.monotonic() - started >= 0.05
+
+    def bump():
+        time.sleep(0.05)
+        with r._lock:
+            r._bump_version()
+
+    threading.Thread(target=bump).start()
+    assert r.wait_for_change(since, timeout=5)
+    assert r.status.version == since + 1
+
+
+def test_serve_runner_api_returns_bound_port(make_runner):
+    r = make_runner([])
+    port = serve_runner_api_in_thread(r, host="127.0.0.1", port=0, log_level="error")
+    assert port > 0
+    resp = requests.get(f"http://127.0.0.1:{port}/status", timeout=5)
+    assert resp.status_code == 200
+
+
+def test_snapshot_returns_status_and_outputs(make_runner):
+    python = sys.executable
+    r = make_runner(
+        [
+            {
+                "name": "one",
+                "source": {
+                    "type": "process",
+                    "configuration": {"command": [python, "-c", "print('{}')"]},
+                },
+                "output": [{"name": "x", "type": "json"}],
+            },
+        ]
+    )
+    port = serve_runner_api_in_thread(r, host="127.0.0.1", port=0, log_level="error")
+    r.run()
+
+    url = f"http://127.0.0.1:{port}/snapshot"
+    resp = requests.get(url, timeout=5)
+    assert resp.status_code == 200
+    data = resp.json()
+    assert data["status"]["completed_steps"] == 1
+    assert data["outputs"] == r.flows
+
+    etag = resp.headers["ETag"]
+    again = requests.get(url, headers={"If-None-Match": etag}, timeout=5)
+    assert again.status_code == 304
+
+
+def test_runner_server_matches_shared_api_payloads(make_runner):
+    from flowtoy.api import build_snapshot, build_status, status_etag
+
+    r = make_runner([])
+    r.run()
+    port = serve_runner_api_in_thread(r, host="127.0.0.1", port=0, log_level="error")
+    base = f"http://127.0.0.1:{port}"
+
+    resp = requests.get(base + "/status", timeout=5)
+    assert resp.json() == build_status(r)
+    assert resp.headers["ETag"] == status_etag(r)
+    resp = requests.get(base + "/snapshot", timeout=5)
+    assert resp.json() == build_snapshot(r)
+    assert resp.headers["ETag"] == status_etag(r)
+
+
+def test_log_capture_records_since():
+    import logging
+
+    from flowtoy.runner_api import LogCapture
+
+    capture = LogCapture(maxlen=3)
+    logger = logging.getLogger("flowtoy.tests.capture")
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    logger.addHandler(capture)
+    try:
+        for i in range(5):
+            logger.info("line %d", i)
+        # a reader that fell behind only gets what is still buffered
+        assert capture.records_since(0) == (5, ["line 2", "line 3", "line 4"])
+        assert capture.records_since(4) == (5, ["line 4"])
+        assert capture.records_since(5) == (5, [])
+    finally:
+        logger.removeHandler(capture)
+
+
+def test_output_events_send_only_changed_steps(make_runner):
+    import asyncio
+    import json
+    import threading
+
+    from flowtoy.api import output_events
+
+    r = make_runner([])
+    r.flows = {"a": {"x": 1}}
+    stop = threading.Event()
+
+    def data(event):
+        id_line, data_line = event.rstrip(b"\n").split(b"\n")
+        assert id_line == b"id: %d" % r.status.version
+        assert data_line.startswith(b"data: ")
+        return json.loads(data_line[6:])
+
+    async def main():
+        events = output_events(r, stop=stop, timeout=0.05)
+        assert data(await events.__anext__()) == {"a": {"x": 1}}
+
+        # nothing changed: only a keep-alive comment
+        assert await events.__anext__() == b": keep-alive\n\n"
+
+        with r._lock:
+            r.flows = {**r.flows, "b": {"y": 2}}
+            r._bump_version()
+        assert data(await events.__anext__()) == {"b": {"y": 2}}
+
+        # a stopping server ends the stream
+        stop.set()
+        async for _ in events:
+            raise AssertionError("stream continued after stop")
+
+    asyncio.run(main())
+
+
+def test_server_shutdown_ends_open_output_streams(make_runner):
+    import socket
+    import threading
+
+    from flowtoy.runner_api import runner_api_server
+
+    r = make_runner([])
+    r.run()
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    server = runner_api_server(r, port=port, log_level="error")
+    t = threading.Thread(target=server.run, daemon=True)
+    t.start()
+    while not server.started:
+        time.sleep(0.01)
+
+    resp = requests.get(
+        f"http://127.0.0.1:{port}/outputs/stream", stream=True, timeout=10
+    )
+    lines = resp.iter_lines()
+    assert next(lines).startswith(b"id: ")
+
+    started = time.monotonic()
+    server.should_exit = True
+    t.join(10)
+    assert not t.is_alive()
+    # the stream ended with the server instead of holding it until the
+    # 25s keep-alive or the client leaving
+    assert time.monotonic() - started < 5
+    # the response has ended, so reading the rest returns instead of blocking
+    list(lines)
+    resp.close()
+
+
+def test_captured_server_logs_stay_off_root_handlers(make_runner):
+    import io
+    import logging
+
+    from flowtoy.runner_api import LogCapture
+
+    # stands in for the stderr handler the CLI installs with basicConfig
+    stderr = io.StringIO()
+    root_handler = logging.StreamHandler(stderr)
+    root = logging.getLogger()
+    root.addHandler(root_handler)
+    loggers = [logging.getLogger(n) for n in ("uvicorn", "uvicorn.access")]
+    saved = [(lg.handlers[:], lg.level, lg.propagate) for lg in loggers]
+    capture = LogCapture(maxlen=100)
+    try:
+        r = make_runner([])
+        port = serve_runner_api_in_thread(
+            r, port=0, log_level="info", log_capture=capture
+        )
+        requests.get(f"http://127.0.0.1:{port}/status", timeout=5)
+        time.sleep(0.1)
+
+        records = list(capture.records)
+        assert [line for line in records if "GET /status" in line] != []
+        # each access line is captured once
+        assert len(records) == len(set(records))
+        assert stderr.getvalue() == ""
+    finally:
+        root.removeHandler(root_handler)
+        for lg, (handlers, level, propagate) in zip(loggers, saved, strict=True):
+            lg.handlers[:] = handlers
+            lg.setLevel(level)
+            lg.propagate = propagate
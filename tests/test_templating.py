@@ -0,0 +1,55 @@
+from jinja2 import Environment, StrictUndefined
+
+from flowtoy.templating import (
+    compile_dict_templates,
+    compile_template,
+    render_dict_templates,
+    render_template,
+)
+
+
+def test_plain_strings_render_like_jinja():
+    # the no-template fast path must match what Jinja itself would return
+    env = Environment(undefined=StrictUndefined)
+    for text in ["abc", "abc\n", "abc\n\n", "a\r\nb", "", "\n", "x }} y", "{a}"]:
+        assert render_template(text, {}) == env.from_string(text).render()
+
+
+def test_templates_still_render():
+    assert render_template("{{ flows.a.x }}!", {"flows": {"a": {"x": 1}}}) == "1!"
+    assert render_template("a{# note #}b", {}) == "ab"
+
+
+def test_compiled_templates_match_render_template():
+    ctx = {"flows": {"a": {"x": 1}}}
+    for text in ["abc\n", "a\r\nb", "{{ flows.a.x }}!", "a{# note #}b", ""]:
+        assert compile_template(text)(ctx) == render_template(text, ctx)
+
+
+def test_compiled_dict_templates_match_render_dict_templates():
+    cfg = {
+        "url": "http://x/{{ flows.a.id }}",
+        "headers": {"Accept": "application/json"},
+        "args": ["-v", "{{ flows.a.id }}"],
+        "timeout": 5,
+    }
+    ctx = {"flows": {"a": {"id": 7}}}
+    rendered = compile_dict_templates(cfg)(ctx)
+    assert rendered == render_dict_templates(cfg, ctx)
+    assert rendered is not cfg and rendered["args"] is not cfg["args"]
+    # template-free subtrees are copied too, so the result can be modified
+    assert rendered["headers"] is not cfg["headers"]
+    rendered["headers"]["Accept"] = "text/plain"
+    assert compile_dict_templates(cfg)(ctx)["headers"] == {"Accept": "application/json"}
+
+
+def test_dotted_paths_match_jmespath():
+    import jmespath
+
+    from flowtoy.templating import extract_jmespath
+
+    data = {"a": {"b": {"c": 1}, "n": None, "l": [1]}, "_x": 2}
+    for expr in ["a.b.c", "a.b", "a.n.x", "a.l.x", "missing.x", "_x", "a.b.c.d"]:
+        assert extract_jmespath(expr, data) == jmespath.search(expr, data)
+    assert extract_jmespath("a", [1]) is None
+    assert extract_jmespath("a.l[0]", data) == 1
@@ -0,0 +1,385 @@
+import asyncio
+import json
+import logging
+import socket
+import threading
+import time
+
+import pytest
+from textual import events
+from textual.app import App
+
+from flowtoy import tui
+from flowtoy.runner_api import LogCapture, serve_runner_api_in_thread
+from flowtoy.tui import FlowToyTUI
+
+
+@pytest.fixture
+def runner_url(make_runner):
+    """A finished one-step runner served on a free port.
+
+    Yields ``(runner, status_url)``.
+    """
+    r = make_runner(
+        [
+            {
+                "name": "env_step",
+                "source": {"type": "env", "configuration": {"vars": ["FLOWTOY_TUI"]}},
+                "output": [{"name": "vars", "type": "json"}],
+            }
+        ]
+    )
+    r.run()
+    port = serve_runner_api_in_thread(r, port=0, log_level="error")
+    yield r, f"http://127.0.0.1:{port}/status"
+
+
+def run_app(app: FlowToyTUI, check) -> None:
+    """Run ``app`` headless and call ``await check(pilot)`` inside it."""
+
+    async def main():
+        async with app.run_test() as pilot:
+            await check(pilot)
+
+    asyncio.run(main())
+
+
+async def wait_for(pilot, condition, timeout: float = 5.0) -> None:
+    for _ in range(int(timeout / 0.02)):
+        if condition():
+            return
+        await pilot.pause(0.02)
+    raise AssertionError("condition not met in time")
+
+
+def test_older_snapshot_does_not_replace_streamed_outputs(runner_url):
+    r, url = runner_url
+    app = FlowToyTUI(status_url=url)
+
+    async def check(pilot):
+        # once the stream is up, polls fetch only /status and the finished
+        # runner sends no more events, so only the calls below touch outputs
+        await wait_for(pilot, lambda: app._outputs_streaming)
+        run_id = r.status.run_id
+        app._show_outputs({"a": {"v": 2}}, 10)
+        # a poll that was sent before the stream's event lands afterwards
+        app._show_snapshot(
+            {"status": {"run_id": run_id, "version": 9}, "outputs": {"a": {"v": 1}}}
+        )
+        assert app.outputs_widget.outputs_data == {"a": {"v": 2}}
+        app._show_snapshot(
+            {"status": {"run_id": run_id, "version": 11}, "outputs": {"a": {"v": 3}}}
+        )
+        assert app.outputs_widget.outputs_data == {"a": {"v": 3}}
+        # a restarted server (new run id) counts versions from zero again
+        app._show_snapshot(
+            {"status": {"run_id": run_id + 1, "version": 1}, "outputs": {"b": {}}}
+        )
+        assert app.outputs_widget.outputs_data == {"b": {}}
+
+    run_app(app, check)
+
+
+def test_poll_shows_status_and_outputs(runner_url):
+    _, url = runner_url
+    app = FlowToyTUI(status_url=url)
+
+    async def check(pilot):
+        await wait_for(pilot, lambda: "env_step" in (app.status_widget._text or ""))
+        assert "1/1 completed" in app.status_widget._text
+        await wait_for(pilot, lambda: app.outputs_widget._text is not None)
+        assert '"env_step": {' in app.outputs_widget._text
+
+    run_app(app, check)
+
+
+def test_update_skips_tick_while_fetch_in_flight(runner_url):
+    _, url = runner_url
+    app = FlowToyTUI(status_url=url)
+    release = threading.Event()
+    calls = []
+
+    def slow_fetch(timeout=3.0):
+        calls.append(1)
+        release.wait(5)
+        return None
+
+    async def check(pilot):
+        await wait_for(pilot, lambda: app._poll_worker.is_finished)
+        app.fetch_status = app.fetch_snapshot = slow_fetch
+        app.update_data(force=True)
+        worker = app._poll_worker
+        await wait_for(pilot, lambda: calls)
+        # ticks (even forced ones) don't start a second fetch meanwhile
+        app.update_data(force=True)
+        assert app._poll_worker is worker
+        release.set()
+        await wait_for(pilot, lambda: worker.is_finished)
+        app.update_data(force=True)
+        assert app._poll_worker is not worker
+        await wait_for(pilot, lambda: len(calls) >= 2)
+
+    run_app(app, check)
+
+
+def _closed_port_url() -> str:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    # nothing listens once the socket is closed, so connections are refused
+    return f"http://127.0.0.1:{port}/status"
+
+
+def test_poll_backs_off_while_runner_unreachable():
+    app = FlowToyTUI(status_url=_closed_port_url())
+
+    async def check(pilot):
+        await wait_for(pilot, lambda: app._error_streak >= 1)
+        await wait_for(pilot, lambda: app._poll_worker.is_finished)
+        assert app._retry_at > time.monotonic()
+        worker = app._poll_worker
+        # timer ticks wait for the backoff; a manual refresh does not
+        app.update_data()
+        assert app._poll_worker is worker
+        app.action_refresh()
+        assert app._poll_worker is not worker
+        await wait_for(pilot, lambda: app._poll_worker.is_finished)
+        assert app._error_streak == 2
+        assert app._retry_at - time.monotonic() > tui.RETRY_BACKOFF[0]
+        await wait_for(pilot, lambda: app.status_widget._text is not None)
+        assert app.status_widget._text == "Waiting for runner to start..."
+
+    run_app(app, check)
+
+
+def test_stream_merges_output_changes(runner_url):
+    r, url = runner_url
+    app = FlowToyTUI(status_url=url)
+
+    def publish(flows):
+        with r._lock:
+            r.flows = flows
+            r._bump_version()
+
+    async def check(pilot):
+        await wait_for(pilot, lambda: app._outputs_streaming)
+        env_outputs = r.flows["env_step"]
+        await wait_for(pilot, lambda: "env_step" in app.outputs_widget.outputs_data)
+
+        # the stream sends only the new step; the panel merges it in
+        publish({**r.flows, "extra": {"n": 1}})
+        await wait_for(pilot, lambda: "extra" in app.outputs_widget.outputs_data)
+        assert app.outputs_widget.outputs_data == {
+            "env_step": env_outputs,
+            "extra": {"n": 1},
+        }
+
+        # a removed step arrives as null and is dropped
+        publish({"extra": {"n": 2}})
+        await wait_for(
+            pilot, lambda: app.outputs_widget.outputs_data == {"extra": {"n": 2}}
+        )
+        await wait_for(pilot, lambda: '"n": 2' in (app.outputs_widget._text or ""))
+        assert "env_step" not in app.outputs_widget._text
+
+    run_app(app, check)
+
+
+class _PanelApp(App):
+    """Hosts a single panel, without any polling."""
+
+    def __init__(self, panel):
+        super().__init__()
+        self.panel = panel
+
+    def compose(self):
+        yield self.panel
+
+
+def test_panel_rebuilds_are_debounced():
+    table = tui.StatusTable()
+    renders = []
+    render_status = table.render_status
+
+    def counting_render(status):
+        renders.append(status)
+        return render_status(status)
+
+    table.render_status = counting_render
+
+    async def check(pilot):
+        for done in range(3):
+            table.status_data = {"run_id": 1, "total_steps": 3, "completed_steps": done}
+        assert renders == []
+        await wait_for(pilot, lambda: renders)
+        await pilot.pause(tui.REBUILD_DEBOUNCE * 2)
+        # the burst of updates is rendered once, from the latest data
+        assert [s["completed_steps"] for s in renders] == [2]
+        assert "2/3 completed" in table._text
+
+    run_app(_PanelApp(table), check)
+
+
+def test_unchanged_text_is_not_pushed_to_the_panel():
+    panel = tui.OutputsPanel()
+    updates = []
+
+    async def check(pilot):
+        update = panel._static.update
+        panel._static.update = lambda text: (updates.append(text), update(text))
+        panel.outputs_data = {"a": {"x": 1}}
+        await wait_for(pilot, lambda: updates)
+        # equal outputs in a new dict render the same text: no update
+        panel.outputs_data = {"a": {"x": 1}}
+        await pilot.pause(tui.REBUILD_DEBOUNCE * 2)
+        assert len(updates) == 1
+        panel.outputs_data = {"a": {"x": 2}}
+        await wait_for(pilot, lambda: len(updates) == 2)
+        assert '"x": 2' in updates[-1]
+
+    run_app(_PanelApp(panel), check)
+
+
+def _status(steps):
+    return {
+        "run_id": 1,
+        "total_steps": len(steps),
+        "completed_steps": 0,
+        "steps": steps,
+    }
+
+
+def test_status_rows_are_reused_until_their_step_changes():
+    table = tui.StatusTable()
+    a = {"state": "running", "started_at": 0.0, "outputs": [], "notes": []}
+    b = {"state": "pending", "outputs": [], "notes": []}
+    table.render_status(_status({"a": a, "b": b}))
+    row_a = table._row_cache["a"][1]
+
+    table.render_status(_status({"a": dict(a), "b": {**b, "state": "running"}}))
+    assert table._row_cache["a"][1] is row_a
+    assert table._row_cache["b"][1] == tui.StatusTable.render_row(
+        "b", {**b, "state": "running"}
+    )
+
+    text = table.render_status(_status({"a": {**a, "state": "succeeded"}}))
+    assert table._row_cache["a"][1] != row_a
+    assert tui.STATE_ICONS["succeeded"] in text
+    # rows of steps that went away are not kept
+    assert set(table._row_cache) == {"a"}
+
+
+def test_status_step_order_tracks_added_and_removed_steps():
+    table = tui.StatusTable()
+    step = {"state": "pending"}
+
+    def order(*names):
+        text = table.render_status(_status(dict.fromkeys(names, step)))
+        return [line.split()[0] for line in text.splitlines()[4:]]
+
+    assert order("c", "a") == ["a", "c"]
+    # steps appearing mid-run are inserted into the kept order
+    assert order("c", "b", "a", "d") == ["a", "b", "c", "d"]
+    # a new run with different steps is sorted afresh
+    assert order("z", "b") == ["b", "z"]
+    assert order("z", "b") == ["b", "z"]
+
+
+def test_outputs_reencode_only_changed_steps(monkeypatch):
+    panel = tui.OutputsPanel()
+    encoded = []
+    dumps_pretty = tui.dumps_pretty
+
+    def counting_dumps(value):
+        encoded.append(value)
+        return dumps_pretty(value)
+
+    monkeypatch.setattr(tui, "dumps_pretty", counting_dumps)
+    a, b = {"x": 1}, {"y": [1, 2]}
+    first = panel.render_outputs({"a": a, "b": b})
+    assert json.loads(first) == {"a": a, "b": b}
+
+    encoded.clear()
+    b2 = {"y": [3]}
+    second = panel.render_outputs({"a": a, "b": b2})
+    assert encoded == [b2]
+    assert json.loads(second) == {"a": a, "b": b2}
+
+
+def test_logs_panel_appends_only_new_records():
+    capture = LogCapture(maxlen=100)
+    logger = logging.getLogger("flowtoy.test_tui")
+    logger.addHandler(capture)
+    logger.propagate = False
+    app = FlowToyTUI(status_url=_closed_port_url(), show_logs=True, log_capture=capture)
+
+    async def check(pilot):
+        logs = app.logs_widget
+        logger.warning("first")
+        logs.update_from(capture)
+        logs.update_from(capture)
+        await pilot.pause()
+        assert [line.text for line in logs.lines] == ["first"]
+        logger.warning("second")
+        logger.warning("third")
+        logs.update_from(capture)
+        await pilot.pause()
+        assert [line.text for line in logs.lines] == ["first", "second", "third"]
+
+    try:
+        run_app(app, check)
+    finally:
+        logger.removeHandler(capture)
+        logger.propagate = True
+
+
+def test_polling_pauses_while_app_is_blurred(runner_url):
+    _, url = runner_url
+    app = FlowToyTUI(status_url=url)
+
+    async def check(pilot):
+        await wait_for(pilot, lambda: app._poll_worker.is_finished)
+        app.post_message(events.AppBlur())
+        await pilot.pause()
+        assert not app._poll_timer._active.is_set()
+
+        await wait_for(pilot, lambda: app._poll_worker.is_finished)
+        worker = app._poll_worker
+        app.post_message(events.AppFocus())
+        await pilot.pause()
+        assert app._poll_timer._active.is_set()
+        # focus refreshes right away instead of waiting for the next tick
+        assert app._poll_worker is not worker
+
+    run_app(app, check)
+
+
+def test_fetch_snapshot_uses_etag_and_falls_back(runner_url, http_server):
+    r, url = runner_url
+    app = FlowToyTUI(status_url=url)
+    try:
+        snapshot = app.fetch_snapshot()
+        assert snapshot["status"]["version"] == r.status.version
+        assert snapshot["outputs"] == r.flows
+        # nothing changed: the server answers 304 and there is nothing to apply
+        assert app.fetch_snapshot() is None
+    finally:
+        app._session.close()
+
+    # a /status ETag says nothing about /snapshot, which also carries outputs
+    app = FlowToyTUI(status_url=url)
+    try:
+        assert app.fetch_status()["version"] == r.status.version
+        assert app.fetch_snapshot()["outputs"] == r.flows
+        assert app.fetch_status() is None
+    finally:
+        app._session.close()
+
+    # a server without /snapshot is polled via /status and /outputs instead
+    app = FlowToyTUI(status_url=http_server + "/status")
+    try:
+        snapshot = app.fetch_snapshot()
+        assert app._use_snapshot is False
+        assert "404" in snapshot["status"]["_error"]
+    finally:
+        app._session.close()
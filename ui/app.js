@@ -51,12 +51,25 @@ function renderStatus(s) {
   });
 }
 
-async function tick() {
-  const s = await fetchJson('/status');
-  renderStatus(s);
-  const outs = await fetchJson('/outputs');
-  outputsEl.innerText = JSON.stringify(outs, null, 2);
+const sleep = ms => new Promise(resolve => setTimeout(resolve, ms));
+
+// long-poll: /status?since=N is answered as soon as the status version moves
+// past N (or after the server's timeout), so updates arrive without polling
+async function poll() {
+  let version = null;
+  for (;;) {
+    const s = await fetchJson(version === null ? '/status' : `/status?since=${version}`);
+    renderStatus(s);
+    const outs = await fetchJson('/outputs');
+    outputsEl.innerText = JSON.stringify(outs, null, 2);
+    if (s && typeof s.version === 'number') {
+      version = s.version;
+    } else {
+      // no runner, an error, or a server without long-poll support
+      version = null;
+      await sleep(1000);
+    }
+  }
 }
 
-setInterval(tick, 1000);
-tick();
+poll();